@@ -1,3 +1,3 @@
-from .generate import crawl_package
+from .generate import crawl_package, crawl_packages
 
-__all__ = ["crawl_package"]
+__all__ = ["crawl_package", "crawl_packages"]
@@ -0,0 +1,175 @@
+"""
+Persistent on-disk build cache used for incremental documentation builds.
+
+Parsed modules are stored keyed by a hash of their source together with every
+option that affects parsing. Rendered pages are keyed by the parse key of their
+module plus a digest of the symbol table they may link to, so a page is only
+rendered again when its own source or one of its possible cross-link targets
+changes. Formatted code snippets are kept per version of the tool.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TextIO
+
+from . import constants
+from .models import Module
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = ".pdocs-cache"
+_TRACKED_DISTRIBUTIONS = ("docstring-parser-fork", "astor", "black")
+
+
+def _hash(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _tool_fingerprint() -> str:
+    """Hash of this package's own sources and of the versions of its dependencies."""
+    from importlib import metadata
+
+    parts = [str(CACHE_VERSION)]
+    for source in sorted(Path(__file__).parent.glob("*.py")):
+        parts.append(source.read_text(encoding="utf8"))
+    for dist in _TRACKED_DISTRIBUTIONS:
+        try:
+            parts.append(f"{dist}=={metadata.version(dist)}")
+        except metadata.PackageNotFoundError:
+            parts.append(f"{dist}==")
+    return _hash(*parts)
+
+
+class BuildCache:
+    """Cache of parsed modules and rendered pages, stored below ``cache_dir``."""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self.fingerprint = _tool_fingerprint()
+        # parse key of every module seen in this run, keyed by its file path
+        self.module_keys: dict[Path, str] = {}
+
+    def module_key(
+        self,
+        file_path: Path,
+        source: str,
+        fully_qualified_name: str,
+        include_private: bool,
+    ) -> str:
+        key = _hash(
+            self.fingerprint,
+            str(file_path),
+            fully_qualified_name,
+            str(include_private),
+            str(constants.INCLUDE_LINES),
+            str(constants.INCLUDE_IF),
+            constants.DOCSTRING_STYLE,
+            source,
+        )
+        self.module_keys[file_path] = key
+        return key
+
+    def package_digest(self) -> str:
+        """Digest of every module seen in this run."""
+        return _hash(*sorted(self.module_keys.values()))
+
+    def page_key(self, module: Module, *extra: str) -> str | None:
+        module_key = self.module_keys.get(module.path)
+        if module_key is None:
+            return None
+        return _hash(module_key, str(constants.MAX_LINES), *extra)
+
+    def load_module(self, key: str) -> Module | None:
+        data = self._read(self.cache_dir / "modules" / f"{key}.pkl")
+        if data is None:
+            return None
+        try:
+            return pickle.loads(data)
+        except Exception:  # noqa: BLE001
+            return None
+
+    def store_module(self, key: str, module: Module) -> None:
+        self._write(
+            self.cache_dir / "modules" / f"{key}.pkl",
+            pickle.dumps(module, protocol=pickle.HIGHEST_PROTOCOL),
+        )
+
+    def runtime_key(self, module_name: str, names: list[str]) -> str:
+        # the exports of a module may come from any module of the package
+        return _hash(self.package_digest(), module_name, *names)
+
+    def load_runtime(self, key: str) -> tuple[bool, dict | None]:
+        """Runtime exports of a module, and whether they were found in the cache."""
+        data = self._read(self.cache_dir / "runtime" / f"{key}.pkl")
+        if data is None:
+            return False, None
+        try:
+            return True, pickle.loads(data)
+        except Exception:  # noqa: BLE001
+            return False, None
+
+    def store_runtime(self, key: str, exports: dict | None) -> None:
+        self._write(
+            self.cache_dir / "runtime" / f"{key}.pkl",
+            pickle.dumps(exports, protocol=pickle.HIGHEST_PROTOCOL),
+        )
+
+    def load_page(self, key: str) -> str | None:
+        data = self._read(self.cache_dir / "pages" / f"{key}.md")
+        return None if data is None else data.decode("utf8")
+
+    def store_page(self, key: str, text: str) -> None:
+        self._write(self.cache_dir / "pages" / f"{key}.md", text.encode("utf8"))
+
+    @contextmanager
+    def page_writer(self, key: str) -> Iterator[TextIO]:
+        """Text file the page is written to, stored only if writing succeeds."""
+        path = self.cache_dir / "pages" / f"{key}.md"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf8", newline="") as file:
+                yield file
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        os.replace(tmp_path, path)
+
+    def load_snippets(self) -> dict[tuple[str, int, str], str]:
+        """Formatted code snippets stored by an earlier run of the same version."""
+        data = self._read(self.cache_dir / "snippets" / f"{self.fingerprint}.pkl")
+        if data is None:
+            return {}
+        try:
+            return pickle.loads(data)
+        except Exception:  # noqa: BLE001
+            return {}
+
+    def store_snippets(self, snippets: dict[tuple[str, int, str], str]) -> None:
+        self._write(
+            self.cache_dir / "snippets" / f"{self.fingerprint}.pkl",
+            pickle.dumps(snippets, protocol=pickle.HIGHEST_PROTOCOL),
+        )
+
+    @staticmethod
+    def _read(path: Path) -> bytes | None:
+        try:
+            return path.read_bytes()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
@@ -1,7 +1,3 @@
-from docstring_parser.google import Section, SectionType
-from collections import defaultdict
-
-
 FUNC_FLAG = "🅵"  # flag for func
 CLASS_FLAG = "🅲"  # flag for class
 MODULE_FLAG = "🅜"  # flag for module
@@ -36,6 +32,9 @@ sidebar_position: {}
 MAX_LINES = 25
 INCLUDE_LINES = 20
 INCLUDE_IF = True
+IMPORT_TIMEOUT = 60.0  # seconds the runtime import of a module may take
+FORMATTER = "native"  # formatter of code snippets, see formatter.FORMATTERS
+DOCSTRING_STYLE = "auto"  # style of the docstrings, see parse.DOCSTRING_STYLES
 DETAIL_TEMPLATE_BEGINE = """<details>
 
 <summary>{}</summary>"""
@@ -44,16 +43,12 @@ DETAIL_TEMPLATE_END = """
 """
 
 DOCUSAURUS_SECTION = {
-    "note": Section("Note", "note", SectionType.SINGULAR_OR_MULTIPLE),
-    "info": Section("Info", "info", SectionType.SINGULAR_OR_MULTIPLE),
-    "danger": Section("Danger", "danger", SectionType.SINGULAR_OR_MULTIPLE),
-    "warning": Section("Warning", "warning", SectionType.SINGULAR_OR_MULTIPLE),
-    "tip": Section("Tip", "tip", SectionType.SINGULAR_OR_MULTIPLE),
-}  # for docusaurus annotations
-
-OBJECT_CACHE: dict[dict[str, str]] = defaultdict(
-    lambda: {}
-)  # name: {fully_qualified_name: type}
+    "note": "Note",
+    "info": "Info",
+    "danger": "Danger",
+    "warning": "Warning",
+    "tip": "Tip",
+}  # for docusaurus annotations, key: title of the docstring section
 
 COMMON_TYPE_LINKS = {
     "int": (
@@ -0,0 +1,257 @@
+"""
+Discovery of the module files of a package.
+
+Directories are listed with ``os.scandir``, whose entries know their type without
+another ``stat`` call. Only directories are checked for an ``__init__.py``, and
+excluded files and directories are pruned before they are checked or opened.
+
+Files and directories are excluded by glob patterns, given on the command line
+with ``--exclude`` or listed in a ``.pdocsignore`` file in the package directory
+(one pattern per line, ``#`` starts a comment). A pattern without a ``/`` matches
+the name of a file or directory at any depth, e.g. ``tests`` or ``*_pb2.py``;
+a pattern with a ``/`` matches the path relative to the package directory, e.g.
+``_vendor/*`` or ``*/generated``. A trailing ``/`` only matches directories.
+
+A package directory without an ``__init__.py`` is a namespace package (PEP 420):
+its modules and the packages below it, regular or namespace, are documented
+without a parent module. The portions of a namespace package found in several
+directories are listed together.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable, Iterator
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import NamedTuple
+
+IGNORE_FILE = ".pdocsignore"
+
+
+class ExcludePatterns:
+    """Glob patterns of the files and directories of a package that are not documented."""
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        self.patterns: list[str] = []
+        # (pattern, whether it is matched against the relative path, directories only)
+        self._rules: list[tuple[str, bool, bool]] = []
+        for pattern in patterns:
+            self.add(pattern)
+
+    def __bool__(self) -> bool:
+        return bool(self._rules)
+
+    def add(self, pattern: str) -> None:
+        pattern = pattern.strip()
+        if not pattern or pattern.startswith("#"):
+            return
+        self.patterns.append(pattern)
+        directory = pattern.endswith("/")
+        pattern = pattern.strip("/")
+        self._rules.append((pattern, "/" in pattern, directory))
+
+    @classmethod
+    def for_package(
+        cls, package_path: Path, patterns: Iterable[str] = ()
+    ) -> ExcludePatterns:
+        """The given patterns plus those of the .pdocsignore file of the package."""
+        exclude = cls(patterns)
+        try:
+            lines = (package_path / IGNORE_FILE).read_text(encoding="utf8").splitlines()
+        except OSError:
+            lines = []
+        for line in lines:
+            exclude.add(line)
+        return exclude
+
+    def match(self, relative_path: str, is_dir: bool) -> bool:
+        """Whether a path relative to the package directory (with / separators) is excluded."""
+        name = relative_path.rpartition("/")[2]
+        for pattern, full_path, directory in self._rules:
+            if directory and not is_dir:
+                continue
+            if fnmatchcase(relative_path if full_path else name, pattern):
+                return True
+        return False
+
+
+class ModuleFile(NamedTuple):
+    """A module file found in a package."""
+
+    path: Path
+    # fully qualified name of the package the file belongs to
+    package: str
+    # index of the entry of the parent package, -1 for a top-level module
+    parent: int
+    # the directory entry of a module file, None for an __init__.py
+    entry: os.DirEntry | None = None
+
+    @property
+    def name(self) -> str:
+        """Fully qualified name of the module."""
+        if self.path.stem == "__init__":
+            return self.package
+        return f"{self.package}.{self.path.stem}"
+
+    def stat(self) -> os.stat_result:
+        """Status of the file, cached by its directory entry."""
+        if self.entry is None:
+            return self.path.stat()
+        return self.entry.stat()
+
+
+def _is_private(name: str) -> bool:
+    return name.startswith("_") and not name.startswith("__")
+
+
+def iter_submodule_files(
+    directory: str,
+    fully_qualified_name: str,
+    include_private: bool,
+    exclude: ExcludePatterns | None = None,
+    root: str | None = None,
+) -> Iterator[tuple[str, str, os.DirEntry | None]]:
+    """Yield the submodule files of a package directory.
+
+    Each item holds the file path, the fully qualified name of the package it
+    belongs to and the directory entry of a module file (None for the
+    ``__init__.py`` of a subpackage). Exclude patterns are matched against the
+    paths relative to root, the package directory, which defaults to directory.
+    """
+    prefix_length = len(os.path.join(directory if root is None else root, ""))
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                if exclude and exclude.match(_relative(entry, prefix_length), True):
+                    continue
+                init_py = os.path.join(entry.path, "__init__.py")
+                if os.path.isfile(init_py):
+                    yield init_py, f"{fully_qualified_name}.{entry.name}", None
+            elif entry.name.endswith(".py") and entry.name != "__init__.py":
+                if not include_private and _is_private(entry.name):
+                    continue
+                if exclude and exclude.match(_relative(entry, prefix_length), False):
+                    continue
+                yield entry.path, fully_qualified_name, entry
+
+
+def _relative(entry: os.DirEntry, prefix_length: int) -> str:
+    return entry.path[prefix_length:].replace(os.sep, "/")
+
+
+def _add_package(
+    files: list[ModuleFile],
+    file_path: Path,
+    fully_qualified_name: str,
+    include_private: bool,
+    exclude: ExcludePatterns | None,
+    root: str,
+) -> None:
+    idx = len(files)
+    files.append(ModuleFile(file_path, fully_qualified_name, -1))
+    while idx < len(files):
+        path, name, _, _ = files[idx]
+        if path.stem == "__init__":
+            files.extend(
+                ModuleFile(Path(sub_path), sub_name, idx, entry)
+                for sub_path, sub_name, entry in iter_submodule_files(
+                    str(path.parent), name, include_private, exclude, root
+                )
+            )
+        idx += 1
+
+
+def _add_namespace(
+    files: list[ModuleFile],
+    directory: str,
+    fully_qualified_name: str,
+    include_private: bool,
+    exclude: ExcludePatterns | None,
+    root: str,
+) -> None:
+    prefix_length = len(os.path.join(root, ""))
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                # any directory named like a module may be a namespace package
+                if not entry.name.isidentifier() or entry.name == "__pycache__":
+                    continue
+                if exclude and exclude.match(_relative(entry, prefix_length), True):
+                    continue
+                name = f"{fully_qualified_name}.{entry.name}"
+                init_py = os.path.join(entry.path, "__init__.py")
+                if os.path.isfile(init_py):
+                    _add_package(
+                        files, Path(init_py), name, include_private, exclude, root
+                    )
+                else:
+                    _add_namespace(
+                        files, entry.path, name, include_private, exclude, root
+                    )
+            elif entry.name.endswith(".py") and entry.name != "__init__.py":
+                if not include_private and _is_private(entry.name):
+                    continue
+                if exclude and exclude.match(_relative(entry, prefix_length), False):
+                    continue
+                files.append(
+                    ModuleFile(Path(entry.path), fully_qualified_name, -1, entry)
+                )
+
+
+def discover_modules(
+    file_path: Path,
+    fully_qualified_name: str,
+    include_private: bool,
+    exclude: ExcludePatterns | None = None,
+) -> list[ModuleFile]:
+    """List a module file and, for an __init__.py, all of its submodule files.
+
+    Parents always come before their submodules. The directory of the first
+    file is the root that exclude patterns are relative to.
+    """
+    files: list[ModuleFile] = []
+    _add_package(
+        files,
+        file_path,
+        fully_qualified_name,
+        include_private,
+        exclude,
+        str(file_path.parent),
+    )
+    return files
+
+
+def discover_package(
+    package_path: Path,
+    include_private: bool,
+    exclude: ExcludePatterns | None = None,
+    files: list[ModuleFile] | None = None,
+) -> list[ModuleFile]:
+    """List the module files of a regular or namespace package directory.
+
+    The files are appended to files if given, so that the packages of several
+    directories can be listed together. Modules without a parent in the package
+    have a parent index of -1.
+    """
+    files = [] if files is None else files
+    init_py = package_path / "__init__.py"
+    if init_py.is_file():
+        _add_package(
+            files,
+            init_py,
+            package_path.name,
+            include_private,
+            exclude,
+            str(package_path),
+        )
+    else:
+        _add_namespace(
+            files,
+            str(package_path),
+            package_path.name,
+            include_private,
+            exclude,
+            str(package_path),
+        )
+    return files
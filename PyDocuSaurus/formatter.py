@@ -0,0 +1,428 @@
+"""
+Formatting of the code snippets shown in the rendered pages.
+
+The native formatter lays out ``def``/``class`` headers, decorators and
+assignments from the AST, printed with :func:`ast.unparse`: a statement is kept
+on one line when it fits, otherwise its outermost bracket is split and the items
+are put on one indented line or one per line with a trailing comma. Any other
+code is left as it is. Black remains available as an optional backend
+(``--formatter black``), which formats many snippets with a single
+``format_str`` call.
+"""
+
+from __future__ import annotations
+
+import ast
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Iterable
+
+from . import constants, profiling
+
+DEFAULT_LINE_LENGTH = 80
+DEFAULT_MEMO_SIZE = 8192
+_INDENT = "    "
+_SNIPPET_BOUNDARY = "# pdocs: snippet boundary"
+
+# an item between brackets: prefix, node (None for a bare `*` or `/`) and suffix
+_Item = tuple[str, "ast.AST | None", str]
+
+
+def _width(text: str) -> int:
+    """Display width of text, counting wide east asian characters twice."""
+    if text.isascii():
+        return len(text)
+    return sum(2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in text)
+
+
+class _Layout:
+    """Lays out the header or assignment of one snippet, see :class:`NativeFormatter`."""
+
+    def __init__(self, code: str, line_length: int):
+        self.code = code
+        self.line_length = line_length
+
+    def fits(self, depth: int, text: str) -> bool:
+        if "\n" in text:
+            text = text.split("\n", 1)[0]
+        return len(_INDENT) * depth + _width(text) <= self.line_length
+
+    def src(self, node: ast.AST) -> str:
+        if isinstance(node, ast.JoinedStr) or (
+            isinstance(node, ast.Constant) and isinstance(node.value, (str, bytes))
+        ):
+            # keep the spelling of the snippet, e.g. triple quoted strings
+            segment = ast.get_source_segment(self.code, node)
+            if segment:
+                return segment
+        return ast.unparse(node)
+
+    def statement(self, stmt: ast.stmt, depth: int) -> list[str]:
+        indent = _INDENT * depth
+        if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            lines = []
+            for decorator in stmt.decorator_list:
+                lines.extend(self.lay("@", decorator, "", depth))
+            if isinstance(stmt, ast.ClassDef):
+                lines.extend(self.class_header(stmt, depth))
+            else:
+                lines.extend(self.def_header(stmt, depth))
+            for member in stmt.body:
+                lines.extend(self.statement(member, depth + 1))
+            return lines
+        if isinstance(stmt, ast.Assign):
+            targets = "".join(f"{self.src(target)} = " for target in stmt.targets)
+            return self.lay(targets, stmt.value, "", depth)
+        if isinstance(stmt, ast.AnnAssign):
+            target = f"{self.src(stmt.target)}: {self.src(stmt.annotation)}"
+            if stmt.value is None:
+                return [indent + target]
+            return self.lay(f"{target} = ", stmt.value, "", depth)
+        # the `pass` closing a header
+        return [indent + self.src(stmt)]
+
+    def def_header(
+        self, node: ast.FunctionDef | ast.AsyncFunctionDef, depth: int
+    ) -> list[str]:
+        keyword = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+        head = f"{keyword} {node.name}{self.type_params(node)}("
+        tail = "):"
+        if node.returns is not None:
+            tail = f") -> {self.src(node.returns)}:"
+        return self.brackets(head, self.parameters(node.args), tail, depth)
+
+    def class_header(self, node: ast.ClassDef, depth: int) -> list[str]:
+        head = f"class {node.name}{self.type_params(node)}"
+        items: list[_Item] = [("", base, "") for base in node.bases]
+        items.extend(self.keywords(node.keywords))
+        if not items:
+            return [f"{_INDENT * depth}{head}:"]
+        return self.brackets(head + "(", items, "):", depth)
+
+    def type_params(self, node: ast.AST) -> str:
+        params = getattr(node, "type_params", None)
+        if not params:
+            return ""
+        return "[" + ", ".join(self.src(param) for param in params) + "]"
+
+    def parameters(self, args: ast.arguments) -> list[_Item]:
+        items: list[_Item] = []
+        positional = [*args.posonlyargs, *args.args]
+        defaults = [None] * (len(positional) - len(args.defaults)) + args.defaults
+        for i, (arg, default) in enumerate(zip(positional, defaults)):
+            items.append(self.parameter("", arg, default))
+            if args.posonlyargs and i == len(args.posonlyargs) - 1:
+                items.append(("/", None, ""))
+        if args.vararg is not None:
+            items.append(self.parameter("*", args.vararg, None))
+        elif args.kwonlyargs:
+            items.append(("*", None, ""))
+        for arg, default in zip(args.kwonlyargs, args.kw_defaults):
+            items.append(self.parameter("", arg, default))
+        if args.kwarg is not None:
+            items.append(self.parameter("**", args.kwarg, None))
+        return items
+
+    def parameter(self, star: str, arg: ast.arg, default: ast.expr | None) -> _Item:
+        name = star + arg.arg
+        if arg.annotation is None:
+            if default is None:
+                return (name, None, "")
+            return (f"{name}=", default, "")
+        if default is None:
+            return (f"{name}: ", arg.annotation, "")
+        return (f"{name}: ", arg.annotation, f" = {self.src(default)}")
+
+    @staticmethod
+    def keywords(keywords: list[ast.keyword]) -> list[_Item]:
+        return [
+            ("**" if keyword.arg is None else f"{keyword.arg}=", keyword.value, "")
+            for keyword in keywords
+        ]
+
+    def lay(self, prefix: str, node: ast.expr, suffix: str, depth: int) -> list[str]:
+        """Lay out ``prefix + node + suffix`` at depth, splitting node if needed."""
+        indent = _INDENT * depth
+        line = prefix + self.src(node) + suffix
+        if self.fits(depth, line) or "\n" in line:
+            return [indent + line]
+        split = self.split(node)
+        if split is None:
+            # nothing to split, the line is kept too long
+            return [indent + line]
+        head, items, tail = split
+        explode = isinstance(node, (ast.List, ast.Tuple, ast.Set, ast.Dict))
+        # a trailing comma would turn a sole subscript into a tuple
+        comma = len(items) > 1 or not isinstance(node, (ast.Call, ast.Subscript))
+        return self.brackets(prefix + head, items, tail + suffix, depth, explode, comma)
+
+    def split(self, node: ast.expr) -> tuple[str, list[_Item], str] | None:
+        """The text before the outermost bracket of node, its items and the rest."""
+        if isinstance(node, ast.Call):
+            items: list[_Item] = [("", arg, "") for arg in node.args]
+            items.extend(self.keywords(node.keywords))
+            return f"{self.src(node.func)}(", items, ")"
+        if isinstance(node, ast.Subscript) and not isinstance(node.slice, ast.Slice):
+            elts = node.slice.elts if isinstance(node.slice, ast.Tuple) else []
+            items = [("", elt, "") for elt in elts or [node.slice]]
+            return f"{self.src(node.value)}[", items, "]"
+        if isinstance(node, ast.Dict) and node.keys:
+            items = [
+                ("**", value, "") if key is None else (f"{self.src(key)}: ", value, "")
+                for key, value in zip(node.keys, node.values)
+            ]
+            return "{", items, "}"
+        if isinstance(node, (ast.List, ast.Set)) or (
+            # a tuple of one item needs its comma
+            isinstance(node, ast.Tuple) and len(node.elts) > 1
+        ):
+            items = [("", elt, "") for elt in node.elts]
+            text = self.src(node)
+            return text[0], items, text[-1]
+        return None
+
+    def brackets(
+        self,
+        head: str,
+        items: list[_Item],
+        tail: str,
+        depth: int,
+        explode: bool = False,
+        comma: bool = True,
+    ) -> list[str]:
+        """Lay out ``head + items + tail`` with the items inside the bracket."""
+        indent = _INDENT * depth
+        texts = [
+            prefix + ("" if node is None else self.src(node)) + suffix
+            for prefix, node, suffix in items
+        ]
+        line = head + ", ".join(texts) + tail
+        if self.fits(depth, line) or not items:
+            return [indent + line]
+        lines = [indent + head]
+        if not explode and self.fits(depth + 1, ", ".join(texts)):
+            lines.append(_INDENT * (depth + 1) + ", ".join(texts))
+        else:
+            for i, (prefix, node, suffix) in enumerate(items):
+                end = "," if comma or i < len(items) - 1 else ""
+                if node is None:
+                    lines.append(f"{_INDENT * (depth + 1)}{prefix}{suffix}{end}")
+                else:
+                    lines.extend(self.lay(prefix, node, suffix + end, depth + 1))
+        return lines + [indent + tail]
+
+
+class Formatter:
+    """Formats snippets of python code for the rendered pages."""
+
+    name = ""
+    # whether format_many is cheaper than formatting each snippet on its own
+    batched = False
+
+    def format(self, code: str, line_length: int = DEFAULT_LINE_LENGTH) -> str:
+        raise NotImplementedError
+
+    def format_many(
+        self, snippets: Iterable[str], line_length: int = DEFAULT_LINE_LENGTH
+    ) -> dict[str, str]:
+        """Format several snippets at once, returns formatted code by snippet."""
+        return {code: self.format(code, line_length) for code in snippets}
+
+
+class NativeFormatter(Formatter):
+    """Layout of signatures and assignments built from the AST.
+
+    Other snippets, such as included function bodies, are returned unchanged so
+    they keep the formatting and comments of their source.
+    """
+
+    name = "native"
+
+    def format(self, code: str, line_length: int = DEFAULT_LINE_LENGTH) -> str:
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            print(f"Error while formatting code: {code}")
+            return code
+        if not _is_header(tree):
+            return code
+        lines = _Layout(code, line_length).statement(tree.body[0], 0)
+        return "\n".join(lines) + "\n"
+
+
+class BlackFormatter(Formatter):
+    """Formats snippets with black, which has to be installed.
+
+    Snippets given to :meth:`format_many` are joined and formatted by a single
+    ``format_str`` call; the results are kept for later calls of :meth:`format`.
+    """
+
+    name = "black"
+    batched = True
+
+    def __init__(self):
+        self.formatted: dict[tuple[str, int], str] = {}
+
+    def format(self, code: str, line_length: int = DEFAULT_LINE_LENGTH) -> str:
+        formatted = self.formatted.get((code, line_length))
+        if formatted is not None:
+            return formatted
+        from black import format_str
+
+        try:
+            return format_str(code, mode=_black_mode(line_length))
+        except:  # noqa: E722
+            print(f"Error while formatting code: {code}")
+            return code
+
+    def format_many(
+        self, snippets: Iterable[str], line_length: int = DEFAULT_LINE_LENGTH
+    ) -> dict[str, str]:
+        pending = {
+            code
+            for code in snippets
+            if (code, line_length) not in self.formatted and code.strip()
+        }
+        if pending:
+            self._format_batch(sorted(pending), line_length)
+        return {code: self.format(code, line_length) for code in snippets}
+
+    def _format_batch(self, batch: list[str], line_length: int) -> None:
+        from black import format_str
+
+        source = f"\n{_SNIPPET_BOUNDARY}\n".join(code.strip("\n") for code in batch)
+        try:
+            formatted = format_str(source, mode=_black_mode(line_length))
+        except:  # noqa: E722
+            # one of the snippets is broken, let each one be reported on its own
+            return
+        pieces = re.split(
+            rf"^{re.escape(_SNIPPET_BOUNDARY)}\n", formatted, flags=re.MULTILINE
+        )
+        if len(pieces) != len(batch):
+            return
+        for code, piece in zip(batch, pieces):
+            self.formatted[(code, line_length)] = piece.strip("\n") + "\n"
+
+
+def _black_mode(line_length: int):
+    """Black's mode for snippets, targeting the python versions pdocs runs on.
+
+    With fixed targets black does not infer them from the code, so a snippet is
+    formatted the same on its own and within a batch.
+    """
+    from black import Mode, TargetVersion
+
+    targets = {v for v in TargetVersion if v.value >= TargetVersion.PY310.value}
+    return Mode(line_length=line_length, target_versions=targets)
+
+
+def _is_header(tree: ast.Module) -> bool:
+    """Whether code is an assignment or a ``def``/``class`` header closed by ``pass``.
+
+    Class headers may carry the assignments of their constants.
+    """
+    if len(tree.body) != 1:
+        return False
+    stmt = tree.body[0]
+    if isinstance(stmt, (ast.Assign, ast.AnnAssign)):
+        return True
+    if isinstance(stmt, ast.ClassDef):
+        members = (ast.Assign, ast.AnnAssign, ast.Pass)
+        return all(isinstance(member, members) for member in stmt.body)
+    if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        return len(stmt.body) == 1 and isinstance(stmt.body[0], ast.Pass)
+    return False
+
+
+class FormatMemo:
+    """Bounded LRU of formatted snippets, keyed by formatter, line length and code.
+
+    Lookups count as hits or misses; ``miss_time`` is the time spent formatting
+    the missed snippets, from which :meth:`stats` estimates the time saved.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MEMO_SIZE):
+        self.maxsize = maxsize
+        self.entries: OrderedDict[tuple[str, int, str], str] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.miss_time = 0.0
+
+    def __contains__(self, key: tuple[str, int, str]) -> bool:
+        return key in self.entries
+
+    def format(self, formatter: Formatter, code: str, line_length: int) -> str:
+        key = (formatter.name, line_length, code)
+        formatted = self.entries.get(key)
+        if formatted is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return formatted
+        self.misses += 1
+        start = time.perf_counter()
+        with profiling.phase("format"):
+            formatted = formatter.format(code, line_length)
+        self.miss_time += time.perf_counter() - start
+        self.store(key, formatted)
+        return formatted
+
+    def store(self, key: tuple[str, int, str], formatted: str) -> None:
+        self.entries[key] = formatted
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def update(self, entries: dict[tuple[str, int, str], str]) -> None:
+        """Add entries loaded from disk, without counting them as lookups."""
+        for key, formatted in entries.items():
+            self.store(key, formatted)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = self.misses = 0
+        self.miss_time = 0.0
+
+    def stats(self) -> str:
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0.0
+        saved = self.hits * self.miss_time / self.misses if self.misses else 0.0
+        return (
+            f"Formatted snippets: {self.hits} hits, {self.misses} misses "
+            f"({rate:.1%} hit rate), formatting took {self.miss_time:.2f}s, "
+            f"about {saved:.2f}s saved"
+        )
+
+
+FORMAT_MEMO = FormatMemo()
+
+FORMATTERS: dict[str, type[Formatter]] = {
+    NativeFormatter.name: NativeFormatter,
+    BlackFormatter.name: BlackFormatter,
+}
+_formatter: Formatter | None = None
+
+
+def get_formatter() -> Formatter:
+    """The formatter selected by ``constants.FORMATTER``."""
+    global _formatter
+    if _formatter is None or _formatter.name != constants.FORMATTER:
+        _formatter = FORMATTERS[constants.FORMATTER]()
+    return _formatter
+
+
+def format_code(code: str, line_length: int = DEFAULT_LINE_LENGTH) -> str:
+    return FORMAT_MEMO.format(get_formatter(), code, line_length)
+
+
+def signature_code(signature: str) -> str:
+    """The snippet formatted for a signature, see :func:`format_signature`."""
+    return f"{signature.strip()}\n    pass"
+
+
+def format_signature(signature: str) -> str:
+    formatted_code = format_code(signature_code(signature)).rstrip()
+    # only the closing `pass`, an included body may use the word itself
+    return formatted_code.removesuffix("pass").strip()
@@ -15,63 +15,148 @@ Additional features:
 from __future__ import annotations
 
 import argparse
+import os
+import sys
+from collections.abc import Sequence
 from pathlib import Path
+
+from . import constants, ir, profiling
+from .cache import DEFAULT_CACHE_DIR, BuildCache
+from .discover import ExcludePatterns, ModuleFile, discover_package
+from .formatter import FORMAT_MEMO, FORMATTERS
 from .models import Package
-from .parse import parse_module
+from .parse import DOCSTRING_MEMO, DOCSTRING_STYLES, parse_files
 from .render import MarkdownRenderer
-from . import constants
+from .symbols import SymbolIndex
+from .watch import DEFAULT_INTERVAL, PackageWatcher
 
 
-def crawl_package(package_path: Path, include_private: bool = False) -> Package:
+def crawl_package(
+    package_path: Path,
+    include_private: bool = False,
+    cache: BuildCache | None = None,
+    jobs: int = 1,
+    exclude: Sequence[str] = (),
+) -> Package:
     """Recursively crawl the package directory, parsing each .py file as a Module.
 
     If include_private is False, items (functions, classes, constants, submodules)
     whose names start with a single underscore (but not dunder names like __init__)
-    are excluded.
+    are excluded. If a build cache is given, unchanged modules are loaded from it.
+    With jobs > 1, the files of the package are parsed by that many processes.
+    Files and directories matching the exclude glob patterns, or those of the
+    .pdocsignore file of the package, are skipped.
     """
-    pkg_name = package_path.name
-    package = Package(
-        path=package_path, name=pkg_name, fully_qualified_name=pkg_name, modules=[]
-    )
-    modules = []
-    for file_path in package_path.glob("*.py"):
-        if (
-            not include_private
-            and file_path.stem.startswith("_")
-            and not file_path.stem.startswith("__")
-        ):
-            continue
-        module = parse_module(file_path, package.fully_qualified_name, include_private)
-        if module.name == "__init__":
-            modules.append(module)
-
-    # Add all modules to the package (including nested)
-    while modules:
-        module = modules.pop()
-        package.modules.append(module)
-        modules.extend(module.submodules)
+    return crawl_packages([package_path], include_private, cache, jobs, exclude)[0]
 
-    # Sort package.modules by fully_qualified_name
-    package.modules.sort(key=lambda m: m.fully_qualified_name)
 
-    return package
+def crawl_packages(
+    package_paths: Sequence[Path],
+    include_private: bool = False,
+    cache: BuildCache | None = None,
+    jobs: int = 1,
+    exclude: Sequence[str] = (),
+) -> list[Package]:
+    """Crawl several package directories in one run, see :func:`crawl_package`.
 
+    A directory without an __init__.py is crawled as a namespace package (PEP 420),
+    and the portions of a namespace package given in several directories are merged.
+    All files are parsed by one pool of worker processes and the packages share one
+    symbol index, so that names defined by one package resolve in the others.
+    Returns the packages in the order their directories were given. Raises
+    ValueError if two directories of a regular package share its name.
+    """
+    symbols = SymbolIndex()
+    packages: dict[str, Package] = {}
+    files: list[ModuleFile] = []
+    # package of each discovered file
+    owners: list[Package] = []
+    with profiling.phase("crawl"):
+        for package_path in package_paths:
+            pkg_name = package_path.name
+            package = packages.get(pkg_name)
+            if package is None:
+                package = packages[pkg_name] = Package(
+                    path=package_path,
+                    name=pkg_name,
+                    fully_qualified_name=pkg_name,
+                    modules=[],
+                    symbols=symbols,
+                )
+            elif (package.path / "__init__.py").is_file() or (
+                package_path / "__init__.py"
+            ).is_file():
+                raise ValueError(f"{package_path}: another {pkg_name} was given")
+            start = len(files)
+            discover_package(
+                package_path,
+                include_private,
+                ExcludePatterns.for_package(package_path, exclude),
+                files,
+            )
+            owners.extend([package] * (len(files) - start))
+        modules = parse_files(files, include_private, cache, jobs, symbols)
 
-def main() -> None:
-    parser = argparse.ArgumentParser(
-        description="Crawl a Python package and extract docstrings into Markdown."
-    )
-    parser.add_argument("package_path", help="Path to the Python package directory")
+    for package, module in zip(owners, modules):
+        package.modules.append(module)
+    for package in packages.values():
+        package.modules.sort(key=lambda m: m.fully_qualified_name)
+    return list(packages.values())
+
+
+def _add_package_arguments(parser: argparse.ArgumentParser) -> None:
     parser.add_argument(
-        "output_path",
-        help="Path to write the Markdown file(s)"
-        "Can be a directory or a single file. If a directory, each module will get its own file.",
+        "package_paths",
+        nargs="+",
+        metavar="package_path",
+        help="Path to the Python package directory. Several packages, and "
+        "directories without __init__.py (namespace packages), can be given",
     )
+
+
+def _add_parse_arguments(parser: argparse.ArgumentParser) -> None:
     parser.add_argument(
         "--include-private",
         action="store_true",
         help="Include private functions, classes, and constants (names starting with '_')",
     )
+    parser.add_argument(
+        "--include-lines",
+        default=0,
+        type=int,
+        help="Include some small functions' source code",
+    )
+    parser.add_argument(
+        "--exclude-if",
+        action="store_false",
+        help="Exclude constants, function and class in if statements",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="Skip the files and directories matching this glob pattern, e.g. "
+        "'tests' or '_vendor/*', can be repeated. Patterns are also read from a "
+        ".pdocsignore file in the package directory",
+    )
+    parser.add_argument(
+        "--docstring-style",
+        default=constants.DOCSTRING_STYLE,
+        choices=list(DOCSTRING_STYLES),
+        help="Style of the docstrings, auto detects it for every docstring by "
+        "trying each style",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default=1,
+        type=int,
+        help="Number of processes used to parse modules, 0 to use all CPUs",
+    )
+
+
+def _add_render_arguments(parser: argparse.ArgumentParser) -> None:
     parser.add_argument(
         "--no-runtime",
         action="store_false",
@@ -84,29 +169,241 @@ def main() -> None:
         help="Automatically fold code blocks that exceed this many lines",
     )
     parser.add_argument(
-        "--include-lines",
-        default=0,
+        "--import-timeout",
+        default=constants.IMPORT_TIMEOUT,
+        type=float,
+        help="Seconds the import of a module for runtime information may take",
+    )
+    parser.add_argument(
+        "--formatter",
+        default=constants.FORMATTER,
+        choices=sorted(FORMATTERS),
+        help="Formatter of signatures and code snippets, black has to be installed "
+        "separately",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Write module pages line by line instead of building them in memory",
+    )
+    parser.add_argument(
+        "--stats",
+        "--format-stats",
+        action="store_true",
+        help="Print hit and miss statistics of the parsed docstring, formatted "
+        "snippet and cross-link caches",
+    )
+
+
+def _add_common_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Directory of the incremental build cache, "
+        f"e.g. {DEFAULT_CACHE_DIR}. Caching is disabled if not given",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print the time spent in each phase of the build and the slowest modules",
+    )
+    parser.add_argument(
+        "--profile-top",
+        default=10,
         type=int,
-        help="Include some small functions' source code",
+        help="Number of slowest modules in the profile report",
     )
     parser.add_argument(
-        "--exclude-if",
-        action="store_false",
-        help="Exclude constants, function and class in if statements",
+        "--profile-output",
+        default=None,
+        help="Also profile to this file, a Chrome trace of the phases if it ends "
+        "with .json, cProfile stats (for pstats or snakeviz) otherwise",
     )
-    args = parser.parse_args()
-    package_dir = Path(args.package_path)
-
-    if not package_dir.is_dir():
-        print(f"Error: {package_dir} is not a directory.")
-        return
-    constants.MAX_LINES = args.max_lines
-    constants.INCLUDE_LINES = args.include_lines
-    constants.INCLUDE_IF = args.exclude_if
-    package = crawl_package(package_dir, include_private=args.include_private)
-    renderer = MarkdownRenderer()
-    output_path = Path(args.output_path)
-    renderer.render(package, output_path, args.no_runtime)
+
+
+def _build_parser(command: str | None) -> argparse.ArgumentParser:
+    if command == "parse":
+        parser = argparse.ArgumentParser(
+            prog="pdocs parse",
+            description="Crawl a Python package and write its intermediate "
+            "representation, to be rendered later with pdocs render.",
+        )
+        _add_package_arguments(parser)
+        parser.add_argument(
+            "--emit",
+            required=True,
+            help="File to write the intermediate representation to, JSON or, "
+            "if it ends with .msgpack, msgpack",
+        )
+        _add_parse_arguments(parser)
+    elif command == "render":
+        parser = argparse.ArgumentParser(
+            prog="pdocs render",
+            description="Render the intermediate representation written by "
+            "pdocs parse into Markdown.",
+        )
+        parser.add_argument(
+            "--from",
+            dest="ir_path",
+            required=True,
+            help="Intermediate representation written by pdocs parse",
+        )
+        parser.add_argument(
+            "output_path",
+            help="Path to write the Markdown file(s)"
+            "Can be a directory or a single file. If a directory, each module will get its own file.",
+        )
+        _add_render_arguments(parser)
+    else:
+        parser = argparse.ArgumentParser(
+            description="Crawl a Python package and extract docstrings into Markdown. "
+            "Use 'pdocs parse' and 'pdocs render' to run both steps separately."
+        )
+        _add_package_arguments(parser)
+        parser.add_argument(
+            "output_path",
+            help="Path to write the Markdown file(s)"
+            "Can be a directory or a single file. If a directory, each module will get its own file.",
+        )
+        _add_parse_arguments(parser)
+        _add_render_arguments(parser)
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="Keep running and update the pages of changed modules",
+        )
+        parser.add_argument(
+            "--interval",
+            default=DEFAULT_INTERVAL,
+            type=float,
+            help="Seconds between two checks for changed files in watch mode",
+        )
+    _add_common_arguments(parser)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv and argv[0] in ("parse", "render") else None
+    args = _build_parser(command).parse_args(argv[1:] if command else argv)
+
+    if command != "render":
+        package_dirs = [Path(path) for path in args.package_paths]
+        for package_dir in package_dirs:
+            if not package_dir.is_dir():
+                print(f"Error: {package_dir} is not a directory.")
+                return
+        if (
+            command is None
+            and args.watch
+            and (
+                len(package_dirs) > 1 or not (package_dirs[0] / "__init__.py").is_file()
+            )
+        ):
+            print("Error: --watch supports a single package with an __init__.py.")
+            return
+        constants.INCLUDE_LINES = args.include_lines
+        constants.INCLUDE_IF = args.exclude_if
+        constants.DOCSTRING_STYLE = args.docstring_style
+    if command != "parse":
+        constants.MAX_LINES = args.max_lines
+        constants.FORMATTER = args.formatter
+        constants.IMPORT_TIMEOUT = args.import_timeout
+    cache = BuildCache(Path(args.cache_dir)) if args.cache_dir else None
+    profile_output = Path(args.profile_output) if args.profile_output else None
+    profiler = cprofiler = None
+    if args.profile or profile_output is not None:
+        trace = profile_output is not None and profile_output.suffix == ".json"
+        profiler = profiling.Profiler(trace)
+        profiling.start(profiler)
+        if profile_output is not None and not trace:
+            import cProfile
+
+            cprofiler = cProfile.Profile()
+            cprofiler.enable()
+
+    if command == "render":
+        try:
+            packages = [ir.load(Path(args.ir_path))]
+        except (OSError, ir.IRError) as e:
+            print(f"Error: cannot read {args.ir_path}: {e}")
+            return
+    else:
+        try:
+            packages = crawl_packages(
+                package_dirs,
+                include_private=args.include_private,
+                cache=cache,
+                jobs=args.jobs or os.cpu_count() or 1,
+                exclude=args.exclude,
+            )
+        except ValueError as e:
+            print(f"Error: {e}.")
+            return
+    package = packages[0]
+    if command == "parse":
+        if len(packages) > 1:
+            print(f"Error: pdocs parse writes a single package, got {len(packages)}.")
+            return
+        ir.dump(package, Path(args.emit))
+        print(f"Intermediate representation: {len(package.modules)} modules")
+    else:
+        renderer = MarkdownRenderer()
+        output_path = Path(args.output_path)
+        watch = command is None and args.watch
+        if cache is not None:
+            FORMAT_MEMO.update(cache.load_snippets())
+        if not watch:
+            # everything is parsed, the memo would keep the released docstrings alive
+            DOCSTRING_MEMO.drop_entries()
+        # watch mode renders pages again, later builds need the parsed docstrings
+        if len(packages) > 1:
+            stats = renderer.render_packages(
+                packages,
+                output_path,
+                args.no_runtime,
+                cache=cache,
+                stream=args.stream,
+                keep_docstrings=watch,
+            )
+        else:
+            stats = renderer.render(
+                package,
+                output_path,
+                args.no_runtime,
+                cache=cache,
+                stream=args.stream,
+                keep_docstrings=watch,
+            )
+        if stats is not None:
+            print(f"Markdown files: {stats}")
+        if cache is not None:
+            cache.store_snippets(dict(FORMAT_MEMO.entries))
+        if args.stats:
+            if command is None:
+                print(DOCSTRING_MEMO.stats())
+            print(FORMAT_MEMO.stats())
+            if renderer.link_cache is not None:
+                print(renderer.link_cache.stats())
+    if profiler is not None:
+        profiling.stop()
+        print(profiler.report(args.profile_top))
+        if cprofiler is not None:
+            cprofiler.disable()
+            cprofiler.dump_stats(profile_output)
+        elif profile_output is not None:
+            profiler.write_trace(profile_output)
+    if command is None and args.watch:
+        PackageWatcher(
+            package,
+            output_path,
+            renderer,
+            include_private=args.include_private,
+            use_runtime=args.no_runtime,
+            cache=cache,
+            stream=args.stream,
+            exclude=args.exclude,
+        ).watch(args.interval)
 
 
 if __name__ == "__main__":
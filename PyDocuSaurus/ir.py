@@ -0,0 +1,190 @@
+"""
+Serializable intermediate representation (IR) of a parsed package.
+
+The IR holds everything the renderer needs, so that a package parsed once, e.g.
+in CI, can be rendered anywhere without parsing it again. It is a plain tree of
+dicts and lists, written as JSON, or as msgpack if the file name ends with
+``.msgpack`` (requires ``pip install PyDocuSaurus[msgpack]``).
+
+Paths are stored relative to the package directory and only once per module,
+so an IR can be shared across machines (except for the portions of a namespace
+package outside of its first directory, which are stored as absolute paths). ``IR_VERSION`` is raised on every
+incompatible change of the layout; loading an IR of another version fails.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import fields
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .models import Class, Constant, Function, Module, Package
+
+if TYPE_CHECKING:
+    import docstring_parser
+
+IR_FORMAT = "pydocusaurus-ir"
+IR_VERSION = 1
+
+# list fields of the models and the model of their items
+_CHILDREN: dict[str, type] = {
+    "submodules": Module,
+    "constants": Constant,
+    "functions": Function,
+    "classes": Class,
+}
+
+
+class IRError(ValueError):
+    """The file is not an IR this version of PyDocuSaurus can read."""
+
+
+def _docstring_to_ir(doc: docstring_parser.Docstring | None) -> dict | None:
+    if doc is None:
+        return None
+    data = {
+        key: value for key, value in vars(doc).items() if key not in ("meta", "style")
+    }
+    data["style"] = doc.style.name if doc.style is not None else None
+    data["meta"] = [{"kind": type(meta).__name__, **vars(meta)} for meta in doc.meta]
+    return data
+
+
+def _docstring_from_ir(data: dict | None) -> docstring_parser.Docstring | None:
+    if data is None:
+        return None
+    import docstring_parser
+    from docstring_parser import common as docstring_common
+
+    data = dict(data)
+    style = data.pop("style")
+    doc = docstring_parser.Docstring(
+        style=docstring_parser.DocstringStyle[style] if style else None
+    )
+    metas = data.pop("meta")
+    vars(doc).update(data)
+    for meta in metas:
+        meta = dict(meta)
+        kind = meta.pop("kind")
+        cls = getattr(docstring_common, kind, None)
+        if not (
+            isinstance(cls, type) and issubclass(cls, docstring_common.DocstringMeta)
+        ):
+            raise IRError(f"unknown docstring section {kind!r}")
+        item = cls.__new__(cls)
+        vars(item).update(meta)
+        doc.meta.append(item)
+    return doc
+
+
+def _item_to_ir(item: Any, package_path: Path) -> dict:
+    data = {}
+    for field in fields(item):
+        value = getattr(item, field.name)
+        if field.name == "path":
+            # stored once per module, its items share the path of their module
+            if not isinstance(item, Module):
+                continue
+            # the portions of a namespace package may lie in other directories
+            if value.is_relative_to(package_path):
+                value = value.relative_to(package_path).as_posix()
+            else:
+                value = str(value)
+        elif field.name == "docstring":
+            value = _docstring_to_ir(value)
+        elif field.name in _CHILDREN:
+            value = [_item_to_ir(child, package_path) for child in value]
+        data[field.name] = value
+    return data
+
+
+def _item_from_ir(model: type, data: dict, path: Path, package_path: Path) -> Any:
+    if model is Module:
+        path = package_path / data["path"]
+    values = {"path": path}
+    for field in fields(model):
+        if field.name == "path" or field.name not in data:
+            continue
+        value = data[field.name]
+        if field.name == "docstring":
+            value = _docstring_from_ir(value)
+        elif field.name in _CHILDREN:
+            value = [
+                _item_from_ir(_CHILDREN[field.name], child, path, package_path)
+                for child in value
+            ]
+        values[field.name] = value
+    return model(**values)
+
+
+def package_to_ir(package: Package) -> dict:
+    """The IR of a crawled package."""
+    names = {module.fully_qualified_name for module in package.modules}
+    roots = [
+        module
+        for module in package.modules
+        if module.fully_qualified_name.rpartition(".")[0] not in names
+    ]
+    return {
+        "format": IR_FORMAT,
+        "version": IR_VERSION,
+        "package": {
+            "path": str(package.path),
+            "name": package.name,
+            "fully_qualified_name": package.fully_qualified_name,
+            "modules": [_item_to_ir(module, package.path) for module in roots],
+        },
+    }
+
+
+def package_from_ir(data: dict, package_path: Path | None = None) -> Package:
+    """Rebuild a package from its IR, optionally located in another directory."""
+    if not isinstance(data, dict) or data.get("format") != IR_FORMAT:
+        raise IRError("not a PyDocuSaurus IR file")
+    if data.get("version") != IR_VERSION:
+        raise IRError(
+            f"IR version {data.get('version')} is not supported, expected {IR_VERSION}"
+        )
+    ir = data["package"]
+    path = Path(ir["path"]) if package_path is None else package_path
+    package = Package(
+        path=path, name=ir["name"], fully_qualified_name=ir["fully_qualified_name"]
+    )
+    roots = [_item_from_ir(Module, module, path, path) for module in ir["modules"]]
+    # register the symbols breadth first, in the order crawl_package does
+    modules = list(roots)
+    for module in modules:
+        package.symbols.add_module(module)
+        modules.extend(module.submodules)
+    package.modules = sorted(modules, key=lambda m: m.fully_qualified_name)
+    return package
+
+
+def _use_msgpack(path: Path) -> bool:
+    return path.suffix == ".msgpack"
+
+
+def dump(package: Package, path: Path) -> None:
+    """Write the IR of package to path."""
+    data = package_to_ir(package)
+    if _use_msgpack(path):
+        import msgpack
+
+        path.write_bytes(msgpack.packb(data))
+    else:
+        path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf8")
+
+
+def load(path: Path, package_path: Path | None = None) -> Package:
+    """Read a package from the IR file at path."""
+    if _use_msgpack(path):
+        import msgpack
+
+        data = msgpack.unpackb(path.read_bytes())
+    else:
+        try:
+            data = json.loads(path.read_text(encoding="utf8"))
+        except ValueError as e:
+            raise IRError(f"invalid IR file: {e}") from e
+    return package_from_ir(data, package_path)
@@ -2,8 +2,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Protocol
-import docstring_parser
+from typing import TYPE_CHECKING, Protocol
+
+from .symbols import SymbolIndex
+
+if TYPE_CHECKING:
+    import docstring_parser
 
 
 class DocumentedItem(Protocol):
@@ -11,15 +15,17 @@ class DocumentedItem(Protocol):
     fully_qualified_name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Package:
     path: Path
     name: str  # final name (directory name)
     fully_qualified_name: str  # same as name for the top-level package
     modules: list[Module] = field(default_factory=list)
+    # symbols of all modules, used to resolve cross-links
+    symbols: SymbolIndex = field(default_factory=SymbolIndex)
 
 
-@dataclass
+@dataclass(slots=True)
 class Module:
     path: Path
     # final module name (file stem)
@@ -33,9 +39,13 @@ class Module:
     classes: list[Class] = field(default_factory=list)
     exports: list[str] = field(default_factory=list)
     aliases: dict[str, str] = field(default_factory=dict)
+    # imported name: absolute dotted name of what it refers to
+    imports: dict[str, str] = field(default_factory=dict)
+    # modules imported with "from ... import *"
+    star_imports: list[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class Class:
     path: Path
     # final class name
@@ -50,7 +60,7 @@ class Class:
     constants: list[Constant] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class Function:
     path: Path
     name: str  # final function/method name
@@ -61,7 +71,7 @@ class Function:
     body: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Constant:
     path: Path
     name: str  # constant name
@@ -1,15 +1,45 @@
 from __future__ import annotations
 
 import ast
-from .models import Module, Class, Function, Constant
+import io
+import textwrap
+import time
+import tokenize
+from collections import OrderedDict
 from pathlib import Path
-import docstring_parser
-import astor
-from docstring_parser.google import DEFAULT_SECTIONS
-from .constants import DOCUSAURUS_SECTION, OBJECT_CACHE
-from . import constants
+from typing import TYPE_CHECKING
 
-DEFAULT_SECTIONS.extend(list(DOCUSAURUS_SECTION.values()))
+from . import constants, profiling
+from .constants import DOCUSAURUS_SECTION
+from .discover import ExcludePatterns, ModuleFile, discover_modules
+from .models import Class, Constant, Function, Module
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    import docstring_parser
+
+    from .cache import BuildCache
+    from .symbols import SymbolIndex
+
+# docstring_parser and astor are slow to import, they are loaded on first use
+_SECTIONS_ADDED = False
+
+
+def _docstring_parser():
+    """docstring_parser, knowing the Docusaurus admonition sections."""
+    global _SECTIONS_ADDED
+    import docstring_parser
+
+    if not _SECTIONS_ADDED:
+        from docstring_parser.google import DEFAULT_SECTIONS, Section, SectionType
+
+        DEFAULT_SECTIONS.extend(
+            Section(title, key, SectionType.SINGULAR_OR_MULTIPLE)
+            for key, title in DOCUSAURUS_SECTION.items()
+        )
+        _SECTIONS_ADDED = True
+    return docstring_parser
 
 
 def should_include(name: str, include_private: bool) -> bool:
@@ -25,6 +55,148 @@ def should_include(name: str, include_private: bool) -> bool:
     return True
 
 
+DEFAULT_DOCSTRING_MEMO_SIZE = 8192
+# --docstring-style values and the docstring_parser.DocstringStyle they select
+DOCSTRING_STYLES = {
+    "auto": "AUTO",
+    "google": "GOOGLE",
+    "numpy": "NUMPYDOC",
+    "rest": "REST",
+    "epydoc": "EPYDOC",
+}
+
+
+def _parse_docstring(raw_doc: str, style: str) -> docstring_parser.Docstring:
+    parser = _docstring_parser()
+    if style != "auto":
+        try:
+            return parser.parse(raw_doc, parser.DocstringStyle[DOCSTRING_STYLES[style]])
+        except parser.ParseError:
+            # not written in the given style after all, detect it
+            pass
+    return parser.parse(raw_doc)
+
+
+class DocstringMemo:
+    """Bounded LRU of parsed docstrings, keyed by style and raw docstring text.
+
+    Identical docstrings, e.g. of overridden or generated methods, are parsed once
+    and share their Docstring, which is never modified once parsed. ``miss_time``
+    is the time spent parsing, from which :meth:`stats` estimates the time saved.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_DOCSTRING_MEMO_SIZE):
+        self.maxsize = maxsize
+        self.entries: OrderedDict[tuple[str, str], docstring_parser.Docstring] = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+        self.miss_time = 0.0
+
+    def parse(self, raw_doc: str, style: str) -> docstring_parser.Docstring:
+        key = (style, raw_doc)
+        doc = self.entries.get(key)
+        if doc is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return doc
+        self.misses += 1
+        start = time.perf_counter()
+        with profiling.phase("docstring_parser.parse"):
+            doc = _parse_docstring(raw_doc, style)
+        self.miss_time += time.perf_counter() - start
+        self.entries[key] = doc
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return doc
+
+    def take_counts(self) -> tuple[int, int, float]:
+        """Hits, misses and parse time since the last call, e.g. of a worker process."""
+        counts = (self.hits, self.misses, self.miss_time)
+        self.hits = self.misses = 0
+        self.miss_time = 0.0
+        return counts
+
+    def add_counts(self, counts: tuple[int, int, float]) -> None:
+        hits, misses, miss_time = counts
+        self.hits += hits
+        self.misses += misses
+        self.miss_time += miss_time
+
+    def drop_entries(self) -> None:
+        """Release the parsed docstrings, but keep the counts for :meth:`stats`."""
+        self.entries.clear()
+
+    def clear(self) -> None:
+        self.drop_entries()
+        self.hits = self.misses = 0
+        self.miss_time = 0.0
+
+    def stats(self) -> str:
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0.0
+        saved = self.hits * self.miss_time / self.misses if self.misses else 0.0
+        return (
+            f"Parsed docstrings: {self.hits} hits, {self.misses} misses "
+            f"({rate:.1%} hit rate), parsing took {self.miss_time:.2f}s, "
+            f"about {saved:.2f}s saved"
+        )
+
+
+DOCSTRING_MEMO = DocstringMemo()
+
+
+def parse_docstring(raw_doc: str | None) -> docstring_parser.Docstring | None:
+    if not raw_doc:
+        return None
+    return DOCSTRING_MEMO.parse(raw_doc, constants.DOCSTRING_STYLE)
+
+
+def to_source(node: ast.AST) -> str:
+    import astor
+
+    with profiling.phase("astor.to_source"):
+        return astor.to_source(node)
+
+
+def function_source(
+    node: ast.FunctionDef | ast.AsyncFunctionDef, lines: list[str] | None
+) -> str | None:
+    """Source of a function, with its decorators, if it is short enough to be included.
+
+    The lines are counted on the AST first and the code is sliced from the original
+    source lines, so it keeps its formatting and comments. Without source lines, or
+    if the slice cannot be dedented, the code is generated from the AST instead.
+    """
+    start = _start_line(node)
+    if node.end_lineno - start + 1 >= constants.INCLUDE_LINES:
+        return None
+    if lines is not None:
+        code = textwrap.dedent("".join(lines[start - 1 : node.end_lineno]))
+        # a multiline string indented less than the function keeps it indented
+        if code and not code[0].isspace():
+            return code if code.endswith("\n") else code + "\n"
+    return to_source(node)
+
+
+def _start_line(node: ast.stmt) -> int:
+    """First line of a statement, including its decorators."""
+    decorators = getattr(node, "decorator_list", ())
+    return min([node.lineno, *(decorator.lineno for decorator in decorators)])
+
+
+def _with_next_lines(
+    nodes: list[ast.stmt], next_line: int | None
+) -> Iterator[tuple[ast.stmt, int | None]]:
+    """Each statement with the first line of the one after it.
+
+    The last statement is followed by next_line, the statement after the block.
+    """
+    following = [*(_start_line(node) for node in nodes[1:]), next_line]
+    return zip(nodes, following)
+
+
 def get_string_value(node: ast.AST) -> str | None:
     """Extract a string from an AST node representing a constant."""
     if isinstance(node, ast.Constant) and isinstance(node.value, str):
@@ -86,22 +258,21 @@ def parse_function(
     file_path: Path,
     parent: Class | Module,
     type: str = "function",
+    lines: list[str] | None = None,
 ) -> Function:
     """Parse a function or method node into a Function dataclass instance."""
     signature = build_signature(node)
     raw_doc = ast.get_docstring(node)
-    parsed_doc = docstring_parser.parse(raw_doc) if raw_doc else None
+    parsed_doc = parse_docstring(raw_doc)
     fq_name = f"{parent.fully_qualified_name}.{node.name}"
-    OBJECT_CACHE[node.name][parent.fully_qualified_name] = type
-    code = astor.to_source(node)
     return Function(
         path=file_path,
         name=node.name,
         fully_qualified_name=fq_name,
         signature=f"def {signature}:",
         docstring=parsed_doc,
-        decorator_list=["@" + astor.to_source(d) for d in node.decorator_list],
-        body=code if code.count("\n") < constants.INCLUDE_LINES else None,
+        decorator_list=["@" + to_source(d) for d in node.decorator_list],
+        body=function_source(node, lines),
     )
 
 
@@ -110,11 +281,13 @@ def parse_class(
     parent: Module | Class,
     file_path: Path,
     include_private: bool,
-    code: str,
+    comments: ConstantComments,
+    lines: list[str] | None = None,
+    next_line: int | None = None,
 ) -> Class:
     """Parse a class node into a Class dataclass instance and process its methods and nested classes."""
     raw_doc = ast.get_docstring(node)
-    parsed_doc = docstring_parser.parse(raw_doc) if raw_doc else None
+    parsed_doc = parse_docstring(raw_doc)
     fq_name = f"{parent.fully_qualified_name}.{node.name}"
     # Build a signature for the class, including base classes if any.
     if node.bases:
@@ -123,7 +296,6 @@ def parse_class(
     else:
         signature = f"class {node.name}:"
 
-    OBJECT_CACHE[node.name][fq_name] = "class"
     cls = Class(
         path=file_path,
         name=node.name,
@@ -132,84 +304,127 @@ def parse_class(
         docstring=parsed_doc,
         functions=[],
         classes=[],
-        decorator_list=["@" + astor.to_source(d) for d in node.decorator_list],
+        decorator_list=["@" + to_source(d) for d in node.decorator_list],
     )
     # Process methods and nested classes.
-    for child in node.body:
+    for child, following in _with_next_lines(node.body, next_line):
         if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
             if not should_include(child.name, include_private):
                 continue
-            method = parse_function(child, file_path, parent=cls, type="method")
+            method = parse_function(
+                child, file_path, parent=cls, type="method", lines=lines
+            )
             cls.functions.append(method)
         elif isinstance(child, ast.ClassDef):
             if not should_include(child.name, include_private):
                 continue
             nested_cls = parse_class(
-                child, parent=cls, file_path=file_path, include_private=include_private
+                child,
+                parent=cls,
+                file_path=file_path,
+                include_private=include_private,
+                comments=comments,
+                lines=lines,
+                next_line=following,
             )
             cls.classes.append(nested_cls)
         elif isinstance(child, (ast.AnnAssign, ast.Assign)):
-            parse_constants(child, code, cls, file_path, include_private, cache=False)
+            parse_constants(child, comments, cls, file_path, include_private, following)
     return cls
 
 
 def parse_module_docstring(module_ast: ast.Module) -> docstring_parser.Docstring | None:
     """Extract and parse the module docstring."""
     raw_doc = ast.get_docstring(module_ast)
-    return docstring_parser.parse(raw_doc) if raw_doc else None
+    return parse_docstring(raw_doc)
 
 
-def parse_module_exports(module_ast: ast.Module) -> tuple[list[str], dict[str, str]]:
-    """Extract __all__ exports from an __init__.py module if present and parse import aliases.
+# constants may be documented this many lines below their assignment
+_COMMENT_SEARCH_LINES = 10
 
-    Returns:
-        tuple: A tuple containing:
-            - list of exported names from __all__
-            - dictionary mapping original names to their aliases (from 'import as')
-    """
-    exports: list[str] = []
-    aliases: dict[str, str] = {}
 
-    for node in module_ast.body:
-        if isinstance(node, ast.Assign):
-            for target in node.targets:
-                if isinstance(target, ast.Name) and target.id == "__all__":
-                    if isinstance(node.value, (ast.List, ast.Tuple)):
-                        for elt in node.value.elts:
-                            value = get_string_value(elt)
-                            if value:
-                                exports.append(value)
-                    break
+class ConstantComments:
+    """Index of the comments documenting constants, built once per source file.
 
-        elif isinstance(node, (ast.Import, ast.ImportFrom)):
-            for alias in node.names:
-                if alias.asname:  # This is an 'import as' statement
-                    aliases[alias.asname] = alias.name
-
-    return exports, aliases
-
-
-def _get_comment_of_constants(code: str, line_number: int) -> str | None:
-    lines = code.splitlines()
-    comment = None
-    target = min(line_number + 10, len(lines))
-    line_number -= 1
-    while line_number < target:
-        current_line = lines[line_number].strip()
-        if "#" in current_line:
-            comment = current_line.split("#")[-1].strip()
-            break
-        elif current_line.startswith('"""') or current_line.startswith("'''"):
-            start_quote = current_line[:3]
-            end_quote = current_line[-3:]
-            if start_quote == end_quote:
-                comment = current_line[3:-3]
-                break
-        line_number += 1
-    return comment
-
-
-def parse_constants(node, code, module, file_path, include_private, cache=True):
+    A constant is documented by the first comment or single line triple quoted
+    string found on its own line or on one of the following lines.
+    """
+
+    def __init__(self, code: str):
+        lines = code.splitlines()
+        try:
+            found = self._tokenize(code)
+        except (tokenize.TokenError, SyntaxError):
+            found = self._scan(lines)
+        # line number of the first comment at or below each line
+        self.next_line = [0] * (len(lines) + 2)
+        self.comments = found
+        following = 0
+        for line_number in range(len(lines), 0, -1):
+            if line_number in found:
+                following = line_number
+            self.next_line[line_number] = following
+
+    @staticmethod
+    def _tokenize(code: str) -> dict[int, str]:
+        found: dict[int, str] = {}
+        first_on_line = True
+        for token in tokenize.generate_tokens(io.StringIO(code).readline):
+            line_number = token.start[0]
+            if token.type == tokenize.COMMENT:
+                found[line_number] = token.string[1:].strip()
+            elif (
+                token.type == tokenize.STRING
+                and first_on_line
+                and token.start[0] == token.end[0]
+                and token.string[:3] in ('"""', "'''")
+                and token.line.strip() == token.string
+            ):
+                found.setdefault(line_number, token.string[3:-3])
+            first_on_line = token.type in (
+                tokenize.NEWLINE,
+                tokenize.NL,
+                tokenize.INDENT,
+                tokenize.DEDENT,
+            )
+        return found
+
+    @staticmethod
+    def _scan(lines: list[str]) -> dict[int, str]:
+        """Line based fallback for sources that cannot be tokenized."""
+        found: dict[int, str] = {}
+        for line_number, line in enumerate(lines, 1):
+            line = line.strip()
+            if "#" in line:
+                found[line_number] = line.split("#")[-1].strip()
+            elif line[:3] in ('"""', "'''") and line[:3] == line[-3:]:
+                found[line_number] = line[3:-3]
+        return found
+
+    def get(
+        self,
+        line_number: int,
+        end_line_number: int | None = None,
+        next_line: int | None = None,
+    ) -> str | None:
+        """The comment of a constant assigned from line_number to end_line_number.
+
+        Only comments above next_line, the first line of the next statement, count.
+        """
+        if line_number >= len(self.next_line):
+            return None
+        following = self.next_line[line_number]
+        end = max(line_number + _COMMENT_SEARCH_LINES, (end_line_number or 0) + 1)
+        if not following or following >= end:
+            return None
+        if next_line is not None and following >= next_line:
+            return None
+        return self.comments[following]
+
+
+def parse_constants(
+    node, comments, module, file_path, include_private, next_line: int | None = None
+):
     if isinstance(node, ast.Assign):
         for target in node.targets:
             if (
@@ -222,7 +437,7 @@ def parse_constants(node, code, module, file_path, include_private, cache=True):
                 if hasattr(node, "type_comment") and node.type_comment:
                     type_annotation = node.type_comment
                 # value = ast.unparse(node.value)
-                value = astor.to_source(node.value)
+                value = to_source(node.value)
                 fq_name = f"{module.fully_qualified_name}.{target.id}"
                 constant = Constant(
                     path=file_path,
@@ -230,11 +445,9 @@ def parse_constants(node, code, module, file_path, include_private, cache=True):
                     fully_qualified_name=fq_name,
                     value=value,
                     type=type_annotation,
-                    comment=_get_comment_of_constants(code, node.lineno),
+                    comment=comments.get(node.lineno, node.end_lineno, next_line),
                 )
                 module.constants.append(constant)
-                if cache:
-                    OBJECT_CACHE[target.id][fq_name] = "constant"
                 # break
     # Process annotated assignments.
     elif isinstance(node, ast.AnnAssign):
@@ -253,116 +466,188 @@ def parse_constants(node, code, module, file_path, include_private, cache=True):
                 fully_qualified_name=fq_name,
                 value=value,
                 type=type_annotation,
-                comment=_get_comment_of_constants(code, node.lineno),
+                comment=comments.get(node.lineno, node.end_lineno, next_line),
             )
             module.constants.append(constant)
-            if cache:
-                OBJECT_CACHE[node.target.id][fq_name] = "constant"
 
 
-def parse_module_constants(
-    code: str,
-    module_ast: ast.Module,
-    module: Module,
-    file_path: Path,
-    include_private: bool,
-) -> None:
-    """Parse constants defined in a module.
+class ModuleVisitor(ast.NodeVisitor):
+    """Collects everything documented in a module in one pass over its statements.
 
-    A constant is considered any assignment at module level whose target is a Name in ALL CAPS,
-    excluding __all__. Supports both regular assignments (with optional type comments)
-    and annotated assignments.
+    Every statement of the module body, of its ``if`` blocks and of its ``try``
+    blocks is dispatched exactly once to the ``visit_<NodeType>`` method of its
+    type; expressions are never visited. Functions and classes are documented in
+    the module body and, if ``INCLUDE_IF`` is set, in (nested) ``if`` bodies,
+    constants only one ``if`` deep. Imports are followed in all blocks, exports and
+    import aliases of a package only in its body. New kinds of symbols are added
+    by defining another ``visit_<NodeType>`` method, e.g. in a subclass.
     """
-    for node in module_ast.body:
-        if isinstance(node, ast.If) and constants.INCLUDE_IF:
-            for subnode in node.body:
-                parse_constants(subnode, code, module, file_path, include_private)
-        parse_constants(node, code, module, file_path, include_private)
 
+    def __init__(
+        self,
+        module: Module,
+        file_path: Path,
+        include_private: bool,
+        comments: ConstantComments,
+        lines: list[str] | None = None,
+    ):
+        self.module = module
+        self.file_path = file_path
+        self.include_private = include_private
+        self.comments = comments
+        self.lines = lines
+        self.is_package = module.name == "__init__"
+        fq_name = module.fully_qualified_name
+        # the package relative imports start from
+        self.package = fq_name if self.is_package else fq_name.rpartition(".")[0]
+        # whether the statements visited now are documented, and how deep in blocks
+        self.documented = True
+        self.depth = 0
+        # first line of the statement after the one visited now
+        self.next_line: int | None = None
+
+    def visit_body(self, nodes: list[ast.stmt], documented: bool) -> None:
+        """Visit the statements of a nested block."""
+        outer = self.documented
+        self.documented = outer and documented
+        self.depth += 1
+        try:
+            self._visit_all(nodes)
+        finally:
+            self.documented = outer
+            self.depth -= 1
+
+    def visit_Module(self, node: ast.Module) -> None:
+        self._visit_all(node.body)
+
+    def _visit_all(self, nodes: list[ast.stmt]) -> None:
+        outer = self.next_line
+        for node, next_line in _with_next_lines(nodes, outer):
+            self.next_line = next_line
+            self.visit(node)
+        self.next_line = outer
+
+    def generic_visit(self, node: ast.AST) -> None:
+        """Statements without a visitor document nothing."""
+
+    def visit_If(self, node: ast.If) -> None:
+        self.visit_body(node.body, constants.INCLUDE_IF)
+        self.visit_body(node.orelse, False)
+
+    def visit_Try(self, node: ast.Try) -> None:
+        self.visit_body(node.body, False)
+        for handler in node.handlers:
+            self.visit_body(handler.body, False)
+        self.visit_body(node.orelse, False)
+        self.visit_body(node.finalbody, False)
+
+    # try/except* blocks, Python 3.11+
+    visit_TryStar = visit_Try
+
+    def visit_FunctionDef(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> None:
+        if self.documented and should_include(node.name, self.include_private):
+            self.module.functions.append(
+                parse_function(
+                    node, self.file_path, parent=self.module, lines=self.lines
+                )
+            )
 
-def parse_module_functions(
-    module_ast: ast.Module,
-    module: Module,
-    file_path: Path,
-    include_private: bool,
-) -> None:
-    """Parse top-level functions in a module."""
-    for node in module_ast.body:
-        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-            if not should_include(node.name, include_private):
-                continue
-            func = parse_function(node, file_path, parent=module)
-            module.functions.append(func)
-        elif isinstance(node, ast.If) and constants.INCLUDE_IF:
-            parse_module_functions(node, module, file_path, include_private)
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        if self.documented and should_include(node.name, self.include_private):
+            self.module.classes.append(
+                parse_class(
+                    node,
+                    parent=self.module,
+                    file_path=self.file_path,
+                    include_private=self.include_private,
+                    comments=self.comments,
+                    lines=self.lines,
+                    next_line=self.next_line,
+                )
+            )
 
+    def visit_Assign(self, node: ast.Assign) -> None:
+        if self.depth == 0 and self.is_package:
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id == "__all__":
+                    if isinstance(node.value, (ast.List, ast.Tuple)):
+                        for elt in node.value.elts:
+                            value = get_string_value(elt)
+                            if value:
+                                self.module.exports.append(value)
+                    break
+        self._visit_constant(node)
 
-def parse_module_classes(
-    code: str,
-    module_ast: ast.Module,
-    module: Module,
-    file_path: Path,
-    include_private: bool,
-) -> None:
-    """Parse classes in a module."""
-    for node in module_ast.body:
-        if isinstance(node, ast.ClassDef):
-            if not should_include(node.name, include_private):
-                continue
-            cls = parse_class(
+    def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
+        self._visit_constant(node)
+
+    def _visit_constant(self, node: ast.Assign | ast.AnnAssign) -> None:
+        if self.documented and self.depth <= 1:
+            parse_constants(
                 node,
-                parent=module,
-                file_path=file_path,
-                include_private=include_private,
-                code=code,
+                self.comments,
+                self.module,
+                self.file_path,
+                self.include_private,
+                self.next_line,
             )
-            module.classes.append(cls)
-        elif isinstance(node, ast.If) and constants.INCLUDE_IF:
-            parse_module_classes(code, node, module, file_path, include_private)
+
+    def visit_Import(self, node: ast.Import) -> None:
+        self._visit_aliases(node)
+        for alias in node.names:
+            if alias.asname:
+                self.module.imports[alias.asname] = alias.name
+            else:
+                name = alias.name.split(".")[0]
+                self.module.imports[name] = name
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        self._visit_aliases(node)
+        base = node.module or ""
+        if node.level:
+            parts = self.package.split(".")
+            if node.level > len(parts):
+                return
+            parent = ".".join(parts[: len(parts) - node.level + 1])
+            base = f"{parent}.{base}" if base else parent
+        for alias in node.names:
+            if alias.name == "*":
+                self.module.star_imports.append(base)
+            else:
+                self.module.imports[alias.asname or alias.name] = f"{base}.{alias.name}"
+
+    def _visit_aliases(self, node: ast.Import | ast.ImportFrom) -> None:
+        """Names a package imports with 'import ... as ...'."""
+        if self.depth == 0 and self.is_package:
+            for alias in node.names:
+                if alias.asname:
+                    self.module.aliases[alias.asname] = alias.name
 
 
-def parse_module_submodules(
-    module: Module,
+def parse_module_source(
+    source: str,
     file_path: Path,
+    fully_qualified_name: str,
     include_private: bool,
-) -> None:
-    """Parse submodules of a module."""
-    for file_path in file_path.parent.iterdir():
-        init_py = file_path / "__init__.py"
-        if init_py.is_file():
-            submodule = parse_module(
-                init_py,
-                f"{module.fully_qualified_name}.{file_path.name}",
-                include_private,
-            )
-            module.submodules.append(submodule)
-        elif file_path.suffix == ".py" and file_path.stem != "__init__":
-            if (
-                not include_private
-                and file_path.name.startswith("_")
-                and not file_path.name.startswith("__")
-            ):
-                continue
-            submodule = parse_module(
-                file_path,
-                f"{module.fully_qualified_name}",
-                include_private,
-            )
-            module.submodules.append(submodule)
+) -> Module:
+    """Parse the source of a single module file, without its submodules."""
+    with profiling.phase("parse", fully_qualified_name):
+        return _parse_module_source(
+            source, file_path, fully_qualified_name, include_private
+        )
 
 
-def parse_module(
+def _parse_module_source(
+    source: str,
     file_path: Path,
     fully_qualified_name: str,
     include_private: bool,
 ) -> Module:
-    """Parse a single module file into a Module dataclass instance."""
-    with file_path.open("r", encoding="utf8") as f:
-        source = f.read()
-    module_ast = ast.parse(source, filename=str(file_path))
+    with profiling.phase("ast.parse"):
+        module_ast = ast.parse(source, filename=str(file_path))
     mod_name = file_path.stem
-    if mod_name != "__init__":
-        fully_qualified_name = f"{fully_qualified_name}.{mod_name}"
     module = Module(
         path=file_path,
         name=mod_name,
@@ -374,10 +659,125 @@ def parse_module(
         exports=[],
         aliases={},
     )
-    parse_module_constants(source, module_ast, module, file_path, include_private)
-    parse_module_functions(module_ast, module, file_path, include_private)
-    parse_module_classes(source, module_ast, module, file_path, include_private)
-    if mod_name == "__init__":
-        module.exports, module.aliases = parse_module_exports(module_ast)
-        parse_module_submodules(module, file_path, include_private)
+    comments = ConstantComments(source)
+    # function bodies are sliced from the source only if they are included
+    lines = source.splitlines(keepends=True) if constants.INCLUDE_LINES > 0 else None
+    ModuleVisitor(module, file_path, include_private, comments, lines).visit(module_ast)
     return module
+
+
+def _init_parse_worker(
+    include_lines: int, include_if: bool, docstring_style: str, trace: bool | None
+) -> None:
+    constants.INCLUDE_LINES = include_lines
+    constants.INCLUDE_IF = include_if
+    constants.DOCSTRING_STYLE = docstring_style
+    # a forked worker starts with the counts of the parent
+    DOCSTRING_MEMO.take_counts()
+    if trace is not None:
+        profiling.start(profiling.Profiler(trace))
+
+
+def _parse_module_worker(
+    args: tuple[str, Path, str, bool],
+) -> tuple[Module, tuple[int, int, float], dict | None]:
+    module = parse_module_source(*args)
+    counts = DOCSTRING_MEMO.take_counts()
+    profiler = profiling.active()
+    if profiler is None:
+        return module, counts, None
+    # the phases of this module only, the parent merges them into its profiler
+    snapshot = profiler.snapshot()
+    profiler.reset()
+    return module, counts, snapshot
+
+
+def parse_module(
+    file_path: Path,
+    fully_qualified_name: str,
+    include_private: bool,
+    cache: BuildCache | None = None,
+    jobs: int = 1,
+    symbols: SymbolIndex | None = None,
+    exclude: ExcludePatterns | None = None,
+) -> Module:
+    """Parse a module file into a Module dataclass instance.
+
+    For an __init__.py all submodules are parsed as well, see :func:`parse_files`.
+    Files matching the exclude patterns are neither parsed nor read.
+    """
+    entries = discover_modules(
+        file_path, fully_qualified_name, include_private, exclude
+    )
+    return parse_files(entries, include_private, cache, jobs, symbols)[0]
+
+
+def parse_files(
+    entries: list[ModuleFile],
+    include_private: bool,
+    cache: BuildCache | None = None,
+    jobs: int = 1,
+    symbols: SymbolIndex | None = None,
+) -> list[Module]:
+    """Parse discovered module files, returns their modules in the same order.
+
+    Each file is parsed exactly once, by up to `jobs` worker processes, and the
+    modules are added to the submodules of their parents. The symbols of every
+    module are registered in the given index in a fixed order afterwards, so the
+    result does not depend on the number of jobs. If a build cache is given,
+    unchanged modules are loaded from it instead of being parsed again.
+    """
+    modules: list[Module | None] = [None] * len(entries)
+    keys: list[str | None] = [None] * len(entries)
+    pending: list[int] = []
+    tasks: list[tuple[str, Path, str, bool]] = []
+    for idx, entry in enumerate(entries):
+        path, name = entry.path, entry.name
+        with profiling.phase("read"), path.open("r", encoding="utf8") as f:
+            source = f.read()
+        if cache is not None:
+            keys[idx] = cache.module_key(path, source, name, include_private)
+            with profiling.phase("cache"):
+                modules[idx] = cache.load_module(keys[idx])
+        if modules[idx] is None:
+            pending.append(idx)
+            tasks.append((source, path, name, include_private))
+
+    if jobs > 1 and len(tasks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        profiler = profiling.active()
+        trace = None if profiler is None else profiler.events is not None
+        with ProcessPoolExecutor(
+            max_workers=min(jobs, len(tasks)),
+            initializer=_init_parse_worker,
+            initargs=(
+                constants.INCLUDE_LINES,
+                constants.INCLUDE_IF,
+                constants.DOCSTRING_STYLE,
+                trace,
+            ),
+        ) as pool:
+            chunksize = max(1, len(tasks) // (jobs * 4))
+            parsed = []
+            for module, counts, snapshot in pool.map(
+                _parse_module_worker, tasks, chunksize=chunksize
+            ):
+                parsed.append(module)
+                DOCSTRING_MEMO.add_counts(counts)
+                if snapshot is not None:
+                    profiler.merge(snapshot)
+    else:
+        parsed = [parse_module_source(*task) for task in tasks]
+    for idx, module in zip(pending, parsed):
+        modules[idx] = module
+        if cache is not None:
+            cache.store_module(keys[idx], module)
+
+    for idx, module in enumerate(modules):
+        if symbols is not None:
+            symbols.add_module(module)
+        parent = entries[idx].parent
+        if parent >= 0:
+            modules[parent].submodules.append(module)
+    return modules
@@ -0,0 +1,177 @@
+"""
+Phase timing of a documentation build.
+
+The expensive steps of a build are wrapped in ``phase(name, module)``. While no
+profiler is active that is a shared no-op context manager, so the hooks cost next
+to nothing. An active :class:`Profiler` records the wall time and call count of
+every phase, the cost of every module, and optionally every single call as an
+event of a Chrome trace (viewable in ``chrome://tracing`` or Perfetto).
+
+Phases nest, e.g. ``ast.parse`` runs within ``parse``, and their times are
+inclusive. Only the outermost phase of the work done for a module is given the
+module name, so that the cost of a module is not counted twice.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+# called with the phase name, the module name (or None) and the elapsed seconds,
+# for the phases recorded in this process (not those merged from worker processes)
+Hook = Callable[[str, "str | None", float], None]
+
+_active: Profiler | None = None
+_NO_PHASE = nullcontext()
+
+
+@dataclass
+class PhaseStats:
+    calls: int = 0
+    seconds: float = 0.0
+
+
+class Profiler:
+    """Collects the time spent in the phases of a build, per phase and per module."""
+
+    def __init__(self, trace: bool = False):
+        self.phases: dict[str, PhaseStats] = {}
+        self.modules: dict[str, float] = {}
+        self.events: list[dict[str, Any]] | None = [] if trace else None
+        self.hooks: list[Hook] = []
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> Self:
+        start(self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        stop()
+
+    def record(
+        self, name: str, begin: float, end: float, module: str | None = None
+    ) -> None:
+        """Add a call of a phase that ran from begin to end (perf_counter seconds)."""
+        elapsed = end - begin
+        with self._lock:
+            stats = self.phases.get(name)
+            if stats is None:
+                stats = self.phases[name] = PhaseStats()
+            stats.calls += 1
+            stats.seconds += elapsed
+            if module is not None:
+                self.modules[module] = self.modules.get(module, 0.0) + elapsed
+            if self.events is not None:
+                self.events.append(
+                    {
+                        "name": name,
+                        "ph": "X",
+                        "ts": begin * 1e6,
+                        "dur": elapsed * 1e6,
+                        "pid": os.getpid(),
+                        "tid": threading.get_ident(),
+                        "args": {} if module is None else {"module": module},
+                    }
+                )
+        for hook in self.hooks:
+            hook(name, module, elapsed)
+
+    @contextmanager
+    def phase(self, name: str, module: str | None = None) -> Iterator[None]:
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, begin, time.perf_counter(), module)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Picklable copy of the collected data, to be merged into another profiler."""
+        with self._lock:
+            return {
+                "phases": {
+                    name: (stats.calls, stats.seconds)
+                    for name, stats in self.phases.items()
+                },
+                "modules": dict(self.modules),
+                "events": None if self.events is None else list(self.events),
+            }
+
+    def merge(self, snapshot: dict[str, Any]) -> None:
+        """Add the data collected by another profiler, e.g. in a worker process."""
+        with self._lock:
+            for name, (calls, seconds) in snapshot["phases"].items():
+                stats = self.phases.setdefault(name, PhaseStats())
+                stats.calls += calls
+                stats.seconds += seconds
+            for module, seconds in snapshot["modules"].items():
+                self.modules[module] = self.modules.get(module, 0.0) + seconds
+            if self.events is not None and snapshot["events"]:
+                self.events.extend(snapshot["events"])
+
+    def reset(self) -> None:
+        with self._lock:
+            self.phases.clear()
+            self.modules.clear()
+            if self.events is not None:
+                self.events.clear()
+
+    def report(self, top: int = 10) -> str:
+        """Table of the phases followed by the top slowest modules."""
+        width = max((len(name) for name in self.phases), default=5) + 2
+        lines = [f"{'Phase':<{width}}{'calls':>8}{'seconds':>11}"]
+        for name, stats in sorted(
+            self.phases.items(), key=lambda item: item[1].seconds, reverse=True
+        ):
+            lines.append(f"{name:<{width}}{stats.calls:>8}{stats.seconds:>11.3f}")
+        if self.modules and top > 0:
+            lines.append("")
+            lines.append(f"Slowest modules (top {top}):")
+            for module, seconds in sorted(
+                self.modules.items(), key=lambda item: item[1], reverse=True
+            )[:top]:
+                lines.append(f"{seconds:>10.3f}  {module}")
+        return "\n".join(lines)
+
+    def write_trace(self, path: Path) -> None:
+        """Write the recorded events in the Chrome trace event format."""
+        events = self.events or []
+        origin = min((event["ts"] for event in events), default=0.0)
+        trace = [{**event, "ts": event["ts"] - origin} for event in events]
+        path.write_text(
+            json.dumps({"traceEvents": trace, "displayTimeUnit": "ms"}),
+            encoding="utf8",
+        )
+
+
+def start(profiler: Profiler) -> None:
+    """Make profiler record the phases of everything built from now on."""
+    global _active
+    _active = profiler
+
+
+def stop() -> Profiler | None:
+    """Stop recording, returns the profiler that was active."""
+    global _active
+    profiler, _active = _active, None
+    return profiler
+
+
+def active() -> Profiler | None:
+    return _active
+
+
+def phase(name: str, module: str | None = None) -> AbstractContextManager[None]:
+    """Time the enclosed block as a call of the phase name, if a profiler is active."""
+    if _active is None:
+        return _NO_PHASE
+    return _active.phase(name, module)
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from contextlib import contextmanager
+from collections.abc import Collection, Iterable, Iterator
 
 from .constants import (
     INDEX_TEMPLATE,
@@ -8,7 +8,6 @@ from .constants import (
     FUNC_FLAG,
     ATTR_FLAG,
     DOCUSAURUS_SECTION,
-    OBJECT_CACHE,
     FLAG_STR_MAPPING,
     UNKNOWN_FLAG,
     METHOD_FLAG,
@@ -16,18 +15,32 @@ from .constants import (
     COMMON_TYPE_LINKS,
     DETAIL_TEMPLATE_BEGINE,
     DETAIL_TEMPLATE_END,
-    Return,
 )
-from . import constants
+from . import constants, profiling
+from .formatter import (
+    FORMAT_MEMO,
+    DEFAULT_LINE_LENGTH,
+    format_code,
+    format_signature,
+    get_formatter,
+    signature_code,
+)
 from functools import lru_cache, partial
-import importlib
+from itertools import chain
+from .runtime import RuntimeInspector
+from .symbols import SymbolIndex
+from .writer import OutputWriter, WriteStats
 from .models import Package, Module, Constant, Class, Function, DocumentedItem
 from pathlib import Path
 import os
+import re
 from collections import defaultdict
-from black import Mode, format_str
-import docstring_parser
-import inspect
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import docstring_parser
+
+    from .cache import BuildCache
 
 FLAG_MAPPING = {
     Constant: ATTR_FLAG,
@@ -45,20 +58,58 @@ CUTTING_MAPPING = {
 }
 _MARKDOWN_CHARACTERS_TO_ESCAPE = set(r"\`*_{}[]<>()#+.!|")
 _MARKDOWN_CHARACTERS_TO_ESCAPE_SIMPLE = set(r"\`*__{}[]<>()#+!|")
+# the backslash comes first, so that the escapes added afterwards are not escaped again
+_ESCAPE_ORDER = sorted(_MARKDOWN_CHARACTERS_TO_ESCAPE, key=lambda c: c != "\\")
+_ESCAPE_SIMPLE_ORDER = sorted(
+    _MARKDOWN_CHARACTERS_TO_ESCAPE_SIMPLE, key=lambda c: c != "\\"
+)
 USE_TYPE_FULL_NAME = False
-
-
-@contextmanager
-def auto_fold(name: str, lines: list[str]):
-    idx = len(lines)
-    yield
-    count = 0
-    for line in lines[idx:]:
-        count += line.count("\n") or 0
-        if count >= constants.MAX_LINES:
-            lines.insert(idx, DETAIL_TEMPLATE_BEGINE.format(name))
-            lines.append(DETAIL_TEMPLATE_END)
-            break
+_ANNOTATION_SEPARATORS = re.compile(r"\s*([\[\],|])\s*")
+_ANNOTATION_PUNCTUATION = {",": ", ", "|": " | "}
+_NO_LINE = object()
+
+
+def fold(name: str, lines: list[str]) -> list[str]:
+    """Wrap a code block in a foldable detail if it spans too many lines."""
+    if sum(line.count("\n") for line in lines) >= constants.MAX_LINES:
+        return [DETAIL_TEMPLATE_BEGINE.format(name), *lines, DETAIL_TEMPLATE_END]
+    return lines
+
+
+def without_last(lines: Iterable[str]) -> Iterator[str]:
+    """Yield all lines but the last one."""
+    previous = _NO_LINE
+    for line in lines:
+        if previous is not _NO_LINE:
+            yield previous
+        previous = line
+
+
+def release_docstrings(module: Module) -> None:
+    """Drop the parsed docstrings of a module and of everything defined in it."""
+    module.docstring = None
+    classes = list(module.classes)
+    for cls in classes:
+        cls.docstring = None
+        classes.extend(cls.classes)
+    for func in chain(module.functions, *(cls.functions for cls in classes)):
+        func.docstring = None
+
+
+@lru_cache(maxsize=4096)
+def tokenize_annotation(text: str) -> tuple[tuple[bool, str], ...]:
+    """Split a type annotation into names and normalized ``[``, ``]``, ``,`` and ``|``.
+
+    Each token is a pair telling whether it is a name to link, joining the tokens
+    gives back the normalized annotation. Results are cached per annotation.
+    """
+    tokens: list[tuple[bool, str]] = []
+    for idx, part in enumerate(_ANNOTATION_SEPARATORS.split(text)):
+        if idx % 2:
+            tokens.append((False, _ANNOTATION_PUNCTUATION.get(part, part)))
+        elif part := part.strip():
+            tokens.append((True, part))
+    return tuple(tokens)
 
 
 def get_relative_path(dir_a, dir_b):
@@ -85,34 +136,6 @@ def get_relative_path(dir_a, dir_b):
     return relative_path
 
 
-def check_type(obj):
-    if inspect.ismodule(obj):
-        return "module"
-    elif inspect.isclass(obj):
-        return "class"
-    elif inspect.ismethod(obj):
-        return "method"
-    elif inspect.isfunction(obj):
-        return "function"
-    else:
-        return "constant"
-
-
-def format_code(code: str, line_length: int = 80) -> str:
-    mode = Mode(line_length=line_length)
-    try:
-        return format_str(code, mode=mode)
-    except:  # noqa: E722
-        print(f"Error while formatting code: {code}")
-        return code
-
-
-def format_signature(signature: str) -> str:
-    full_code = f"{signature.strip()}\n    pass"
-    formatted_code = format_code(full_code)
-    return formatted_code.replace("pass", "").strip().strip("\n")
-
-
 def handle_name_conflict(fq_name: str, with_ext: bool = False) -> str:
     split_names = fq_name.split(".")
     file_name = os.sep.join(fq_name.split(".")[1:])
@@ -124,45 +147,140 @@ def handle_name_conflict(fq_name: str, with_ext: bool = False) -> str:
     return file_name.lower()
 
 
-def try_import_module(module_name: str):
-    try:
-        return importlib.import_module(module_name)
-    except ImportError as e:
-        print("import error", e)
-        return None
-
-
-# fmt: off
 # From https://stackoverflow.com/questions/68699165/how-to-escape-texts-for-formatting-in-python
 def escaped_markdown(text: str, simple=True) -> str:
-    if simple:
-        return "".join(
-            f"\\{character}"
-            if character in _MARKDOWN_CHARACTERS_TO_ESCAPE_SIMPLE
-            else character
-            for character in text.strip()
+    text = text.strip()
+    # one str.replace per escaped character present, in C instead of per character
+    for character in _ESCAPE_SIMPLE_ORDER if simple else _ESCAPE_ORDER:
+        if character in text:
+            text = text.replace(character, f"\\{character}")
+    return text
+
+
+class LinkCache:
+    """Cross-links resolved during one render() call, with hit and miss counts."""
+
+    def __init__(self):
+        self.links: dict[tuple, tuple] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> str:
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0.0
+        return (
+            f"Cross-links: {self.hits} hits, {self.misses} misses ({rate:.1%} hit rate)"
         )
-    return "".join(
-        f"\\{character}" if character in _MARKDOWN_CHARACTERS_TO_ESCAPE else character
-        for character in text.strip()
-    )
-# fmt: on
 
 
 class MarkdownRenderer:
     use_runtime = None
+    keep_docstrings = True
+
+    def __init__(self):
+        # names each rendered page looked up in the symbol index, None if unknown
+        self.page_lookups: dict[str, set[str] | None] = {}
+        self._lookups: set[str] | None = None
+        self.symbols = SymbolIndex()
+        self.modules: dict[str, Module] = {}
+        # cross-links resolved by the current or last render() call
+        self.link_cache: LinkCache | None = None
+        # runtime introspection of exports, only while rendering
+        self.runtime: RuntimeInspector | None = None
+        # other packages rendered next to the current one, see render_packages()
+        self.packages: set[str] = set()
 
     def render(
         self,
         package: Package,
         output_path: Path | None = None,
         use_runtime: bool = True,
-    ) -> None:
+        cache: BuildCache | None = None,
+        stream: bool = False,
+        only: Collection[str] | None = None,
+        keep_docstrings: bool = True,
+    ) -> WriteStats | None:
         """
         Render the given package as Markdown. If output_path is None or '-', output to stdout.
         If output_path is a directory, each module gets its own file; otherwise, all modules go into one file.
+        If a build cache is given, pages of unchanged modules are reused from it.
+        With stream, module pages are written line by line instead of being built in memory.
+        Unchanged files are not rewritten; returns how many files were written, skipped and deleted.
+        If only is given, just the pages of these modules (and the index) are rendered again.
+        Without keep_docstrings, the parsed docstrings of a module are dropped once its page
+        is rendered, so the package cannot be rendered again.
         """
         self.use_runtime = use_runtime
+        self.keep_docstrings = keep_docstrings
+        self.symbols = package.symbols
+        self.modules = {
+            module.fully_qualified_name: module for module in package.modules
+        }
+        self.runtime = RuntimeInspector(cache) if use_runtime else None
+        try:
+            with profiling.phase("render"):
+                return self._render(package, output_path, cache, stream, only)
+        finally:
+            if self.runtime is not None:
+                self.runtime.close()
+                self.runtime = None
+
+    def render_packages(
+        self,
+        packages: list[Package],
+        output_path: Path | None = None,
+        use_runtime: bool = True,
+        cache: BuildCache | None = None,
+        stream: bool = False,
+        keep_docstrings: bool = True,
+    ) -> WriteStats | None:
+        """
+        Render several packages, each into the directory of output_path named after it,
+        next to an index.md listing them. Names defined by one of the packages link to
+        its pages from the others, if the packages share their symbol index.
+        """
+        if output_path is None:
+            for package in packages:
+                self.render(
+                    package, None, use_runtime, cache, stream, None, keep_docstrings
+                )
+            return None
+        stats = WriteStats()
+        lines = [INDEX_TEMPLATE.format("API Reference", 1), "# API Reference", ""]
+        for package in packages:
+            self.packages = {p.fully_qualified_name for p in packages} - {
+                package.fully_qualified_name
+            }
+            try:
+                package_stats = self.render(
+                    package,
+                    output_path / package.fully_qualified_name,
+                    use_runtime,
+                    cache,
+                    stream,
+                    None,
+                    keep_docstrings,
+                )
+            finally:
+                self.packages = set()
+            stats.add(package_stats)
+            name = package.fully_qualified_name
+            lines.append(
+                f"- {MODULE_FLAG} [{escaped_markdown(name)}](./{name}/index.md)"
+            )
+        writer = OutputWriter(output_path)
+        writer.write(output_path / "index.md", "\n".join(lines) + "\n")
+        stats.add(writer.close())
+        return stats
+
+    def _render(
+        self,
+        package: Package,
+        output_path: Path | None,
+        cache: BuildCache | None,
+        stream: bool,
+        only: Collection[str] | None,
+    ) -> WriteStats | None:
 
         lines = [INDEX_TEMPLATE.format("API Reference", 1)]
         lines.append(f"# `{package.name}`")
@@ -181,52 +299,183 @@ class MarkdownRenderer:
         extra_lines = ""
         if output_path is not None:
             output_path.mkdir(parents=True, exist_ok=True)
+            writer = OutputWriter(output_path)
+            symbols = package.symbols.digest() if cache is not None else ""
+            # the root page is part of index.md, so it is always rendered
+            selected = [
+                module
+                for module in package.modules
+                if only is None
+                or module.fully_qualified_name in only
+                or "." not in module.fully_qualified_name
+            ]
+            pages = {
+                module.fully_qualified_name: self._load_page(
+                    module, "." in module.fully_qualified_name, cache, symbols
+                )
+                for module in selected
+            }
+            self._prefetch_snippets(
+                [
+                    module
+                    for module in selected
+                    if pages[module.fully_qualified_name][1] is None
+                ]
+            )
+            self.link_cache = LinkCache()
             for module in package.modules:
                 levels = module.fully_qualified_name.split(".")
-                if len(levels) > 1:
-                    relative_path = os.sep.join(levels[1:-1])
-                file_name = self.link(module)
-                module_lines = self.render_module(module, add_toc=len(levels) > 1)
-                module_lines.append("")
                 # module_output = INDEX_TEMPLATE.format(module.fully_qualified_name if module.name =='__init__' else file_name[:-3]) + "\n".join(module_lines)
-                module_output = INDEX_TEMPLATE.format(
-                    file_name[:-3], 2 if module.name == "__init__" else 3
-                ) + "\n".join(module_lines)
+                header = INDEX_TEMPLATE.format(
+                    self.link(module)[:-3], 2 if module.name == "__init__" else 3
+                )
                 file_name = handle_name_conflict(module.fully_qualified_name, True)
-                if module.name == "__init__":
-                    relative_path = os.sep.join(levels[1:])
-                    if len(levels) > 1:
-                        file_name = os.path.join(relative_path, "index.md")
-                    else:
-                        extra_lines = "\n".join(module_lines)
-                        continue
-                (output_path / relative_path).mkdir(parents=True, exist_ok=True)
+                if module.name == "__init__" and len(levels) > 1:
+                    file_name = os.path.join(*levels[1:], "index.md")
                 file_path = output_path / file_name
-                file_path.write_text(module_output, encoding="utf8")
+                if module.fully_qualified_name not in pages:
+                    writer.keep(file_path)
+                    continue
+                key, text = pages[module.fully_qualified_name]
+                self._lookups = set() if text is None else None
+                with profiling.phase("render page", module.fully_qualified_name):
+                    if len(levels) == 1:
+                        extra_lines = self._render_page(module, False, cache, key, text)
+                    elif stream and text is None:
+                        self._stream_page(module, cache, key, header, writer, file_path)
+                    else:
+                        module_text = self._render_page(module, True, cache, key, text)
+                        writer.write(file_path, header + module_text)
+                if not self.keep_docstrings:
+                    release_docstrings(module)
+                # names looked up in the symbol table, unknown for cached pages
+                self.page_lookups[module.fully_qualified_name] = self._lookups
+                self._lookups = None
             # Write the index file table of contents linking to each module
             lines.append("")
             lines.append(extra_lines)
-            (output_path / "index.md").write_text("\n".join(lines), encoding="utf8")
+            writer.write(output_path / "index.md", "\n".join(lines))
+            # the resolved links are only valid for this render, keep the counts
+            self.link_cache.links.clear()
+            return writer.close()
+        return None
 
-    def _render_constant(self, const: Constant, indent=0) -> str:
+    def _load_page(
+        self,
+        module: Module,
+        add_toc: bool,
+        cache: BuildCache | None,
+        symbols: str,
+    ) -> tuple[str | None, str | None]:
+        """Cache key of a module page and the page itself if it is cached."""
+        if cache is None:
+            return None, None
+        extra = [symbols, str(add_toc), str(self.use_runtime), constants.FORMATTER]
+        if module.exports:
+            # exports may resolve to any module of the package
+            extra.append(cache.package_digest())
+        key = cache.page_key(module, *extra)
+        if key is None:
+            return None, None
+        with profiling.phase("cache"):
+            return key, cache.load_page(key)
+
+    def _render_page(
+        self,
+        module: Module,
+        add_toc: bool,
+        cache: BuildCache | None,
+        key: str | None,
+        text: str | None,
+    ) -> str:
+        """Render the body of a module page unless it was loaded from the cache."""
+        if text is not None:
+            return text
+        module_lines = self.render_module(module, add_toc=add_toc)
+        module_lines.append("")
+        text = "\n".join(module_lines)
+        if key is not None:
+            cache.store_page(key, text)
+        return text
+
+    def _stream_page(
+        self,
+        module: Module,
+        cache: BuildCache | None,
+        key: str | None,
+        header: str,
+        writer: OutputWriter,
+        file_path: Path,
+    ) -> None:
+        """Write a module page straight to its file, and to the cache if keyed."""
+        lines = (f"{line}\n" for line in self.iter_module(module))
+        if key is None:
+            writer.stream(file_path, chain([header], lines))
+            return
+        with cache.page_writer(key) as page:
+
+            def _tee(lines: Iterator[str]) -> Iterator[str]:
+                for line in lines:
+                    page.write(line)
+                    yield line
+
+            writer.stream(file_path, chain([header], _tee(lines)))
+
+    def _prefetch_snippets(self, modules: list[Module]) -> None:
+        """Let a batching formatter format all code snippets of modules at once."""
+        formatter = get_formatter()
+        if not formatter.batched:
+            return
+        classes = [cls for module in modules for cls in module.classes]
+        for cls in classes:
+            classes.extend(cls.classes)
+        functions = [func for module in modules for func in module.functions]
+        functions.extend(func for cls in classes for func in cls.functions)
+        # class signatures contain their formatted constants, so those come first
+        for snippets in (
+            [
+                self._constant_code(const)
+                for owner in [*modules, *classes]
+                for const in owner.constants
+            ],
+            [signature_code(self._class_code(cls)) for cls in classes]
+            + [signature_code(self._function_code(func)) for func in functions],
+        ):
+            with profiling.phase("format"):
+                formatter.format_many(
+                    code
+                    for code in snippets
+                    if (formatter.name, DEFAULT_LINE_LENGTH, code) not in FORMAT_MEMO
+                )
+
+    @staticmethod
+    def _constant_code(const: Constant) -> str:
         value = const.value.strip("\n")
         type_str = f": {const.type}" if const.type else ""
-        return "    " * indent + format_code(f"{const.name}{type_str} = {value}").strip(
-            "\n"
-        )
+        return f"{const.name}{type_str} = {value}"
+
+    def _class_code(self, cls: Class) -> str:
+        constants = ["\n" + self._render_constant(c, indent=1) for c in cls.constants]
+        return "".join([*cls.decorator_list, cls.signature, *constants])
+
+    @staticmethod
+    def _function_code(func: Function) -> str:
+        return func.body or "".join([*func.decorator_list, func.signature])
+
+    def _render_constant(self, const: Constant, indent=0) -> str:
+        return "    " * indent + format_code(self._constant_code(const)).strip("\n")
 
     def render_constant(self, const: Constant, level: int = 2) -> list[str]:
-        lines: list[str] = []
+        return list(self.iter_constant(const, level))
+
+    def iter_constant(self, const: Constant, level: int = 2) -> Iterator[str]:
         header_prefix = "#" * level
-        lines.append(f"{header_prefix} {ATTR_FLAG} {escaped_markdown(const.name)}")
-        lines.append("")
-        with auto_fold(escaped_markdown(const.name), lines):
-            lines.append("```python")
-            lines.append(self._render_constant(const))
-            if const.comment:
-                lines[-1] += " #" + const.comment
-            lines.append("```")
-        return lines
+        yield f"{header_prefix} {ATTR_FLAG} {escaped_markdown(const.name)}"
+        yield ""
+        code = self._render_constant(const)
+        if const.comment:
+            code += " #" + const.comment
+        yield from fold(escaped_markdown(const.name), ["```python", code, "```"])
 
     def render_module(
         self,
@@ -234,40 +483,55 @@ class MarkdownRenderer:
         level: int = 1,
         add_toc: bool = True,
     ) -> list[str]:
+        return list(self.iter_module(module, level, add_toc))
+
+    def iter_module(
+        self,
+        module: Module,
+        level: int = 1,
+        add_toc: bool = True,
+    ) -> Iterator[str]:
         """
         Render a module section that includes the module's signature (if any), its docstring details,
         and a table of contents linking to its classes, functions, constants, exports, and submodules.
+        Lines are generated one section at a time.
         """
-        lines: list[str] = []
+        yield from without_last(self._iter_module(module, level, add_toc))
+
+    def _iter_module(self, module: Module, level: int, add_toc: bool) -> Iterator[str]:
         header_prefix = "#" * level
+        if not (
+            module.constants or module.functions or module.classes or module.exports
+        ):
+            yield "## No Contents Are Generated"
+            yield ""
+            return
         # Render module docstring details if available.
         if module.docstring:
-            lines.extend(
-                self.render_docstring(
-                    module.docstring, module.fully_qualified_name, "module"
-                )
+            yield from self.render_docstring(
+                module.docstring, module.fully_qualified_name, "module"
             )
-            lines.append("")
+            yield ""
         if add_toc:
-            lines.append(f"{header_prefix}# TOC")
-        lines.append("")
+            yield f"{header_prefix}# TOC"
+        yield ""
 
         if module.exports and add_toc:
-            # lines.append(f"- **[Exports](#{module.fully_qualified_name}-exports)**")
-            lines.append("- **[Exports](#exports)**")
+            # yield f"- **[Exports](#{module.fully_qualified_name}-exports)**"
+            yield "- **[Exports](#exports)**"
         # Second-level table of contents for this module.
         if module.constants:
-            lines.append("- **Attributes:**")
+            yield "- **Attributes:**"
             for const in module.constants:
-                lines.append(
+                yield (
                     "  " * 1
                     + f"- {ATTR_FLAG} [{escaped_markdown(const.name, False)}]({self.link(module, const)})"
                     + (f" - {escaped_markdown(const.comment)}" if const.comment else "")
                 )
         if module.functions:
-            lines.append("- **Functions:**")
+            yield "- **Functions:**"
             for func in module.functions:
-                lines.append(
+                yield (
                     "  " * 1
                     + f"- {FUNC_FLAG} [{escaped_markdown(func.name, False)}]({self.link(module, func)})"
                     + (
@@ -277,88 +541,117 @@ class MarkdownRenderer:
                     )
                 )
         if module.classes:
-            lines.append("- **Classes:**")
+            yield "- **Classes:**"
             for cls in module.classes:
-                lines.extend(self.render_class_toc(module, cls, indent=1))
-        if module.constants or module.functions or module.classes or module.exports:
-            lines.append("")
-        else:
-            lines.clear()
-            lines.append("## No Contents Are Generated")
-            lines.append("")
+                yield from self.render_class_toc(module, cls, indent=1)
+        yield ""
 
         # Detailed sections.
         if module.constants:
-            lines.append(f"{header_prefix}# Attributes")
-            lines.append("")
+            yield f"{header_prefix}# Attributes"
+            yield ""
             for const in module.constants:
-                lines.extend(self.render_constant(const, level=level + 1))
-                lines.append("")
-            lines.append("")
+                yield from self.iter_constant(const, level=level + 1)
+                yield ""
+            yield ""
         if module.functions:
-            lines.append(f"{header_prefix}# Functions")
-            lines.append("")
+            yield f"{header_prefix}# Functions"
+            yield ""
             for func in module.functions:
-                lines.extend(self.render_function(func, level=level + 1))
-            lines.append("")
+                yield from self.iter_function(func, level=level + 1)
+            yield ""
         if module.classes:
-            lines.append(f"{header_prefix}# Classes")
-            lines.append("")
+            yield f"{header_prefix}# Classes"
+            yield ""
             for cls in module.classes:
-                lines.extend(
-                    self.render_class_details(
-                        cls, level=level + 1, aliases=module.aliases
-                    )
+                yield from self.iter_class_details(
+                    cls, level=level + 1, aliases=module.aliases
                 )
-            lines.append("")
+            yield ""
         if module.exports:
-            lines.append(f"{header_prefix}# Exports")
-            lines.append("")
-            runtime_module = (
-                try_import_module(module.fully_qualified_name)
-                if self.use_runtime
-                else None
-            )
+            yield f"{header_prefix}# Exports"
+            yield ""
+            runtime_exports = self._resolve_exports(module)
             doc_base = module.fully_qualified_name.split(".")[0]
             for exp in module.exports:
                 link, export_type, full_name = self._cross_file_link(
-                    runtime_module,
+                    runtime_exports,
                     module.fully_qualified_name,
                     exp,
                     doc_base,
                     alias=module.aliases.get(exp, None),
                 )
                 if link:
-                    lines.append(
-                        f"- {FLAG_STR_MAPPING[export_type]} [{escaped_markdown(full_name or exp)}]({link})"
-                    )
+                    yield f"- {FLAG_STR_MAPPING[export_type]} [{escaped_markdown(full_name or exp)}]({link})"
                 else:
-                    lines.append(f"- {UNKNOWN_FLAG} {escaped_markdown(exp)}")
-            lines.append("")
-        lines.pop()
-        return lines
+                    yield f"- {UNKNOWN_FLAG} {escaped_markdown(exp)}"
+            yield ""
+
+    def _resolve_exports(self, module: Module) -> dict[str, tuple[str, str | None]]:
+        """Kind and defining module of the exports, imported only if not found statically."""
+        exports = {}
+        for name in module.exports:
+            if found := self.symbols.resolve_export(
+                self.modules, module.fully_qualified_name, name
+            ):
+                exports[name] = found
+        missing = [name for name in module.exports if name not in exports]
+        if missing and self.runtime is not None:
+            exports.update(
+                self.runtime.exports(module.fully_qualified_name, missing) or {}
+            )
+        return exports
 
     def _try_choose(self, value, alias, cur_level):
-        def _get_info(v):
-            info = OBJECT_CACHE.get(v, None)
-            if info is None or len(info) == 1:
-                return info
-            target_key = cur_level + "." + value
-            if target_key in info:
-                return {target_key: info[target_key]}
+        if self._lookups is not None:
+            self._lookups.add(value)
+            if alias:
+                self._lookups.add(alias)
 
-        return _get_info(alias) or _get_info(value)
+        target = f"{cur_level}.{value}"
+        if alias and (info := self.symbols.resolve(alias, target)):
+            return info
+        return self.symbols.resolve(value, target)
 
-    @lru_cache(32)
     def _cross_file_link(
         self,
-        runtime_module,
+        runtime_exports,
         cur_level,
         value,
         doc_base,
         cut_idx=0,
         need_type=False,
         alias=None,
+    ):
+        """Link to a name as seen from cur_level, cached for the current render."""
+        if self.link_cache is None:
+            return self._resolve_link(
+                runtime_exports, cur_level, value, doc_base, cut_idx, need_type, alias
+            )
+        # the runtime exports and doc_base follow from cur_level and need_type
+        key = (cur_level, value, alias, cut_idx, need_type)
+        resolved = self.link_cache.links.get(key)
+        if resolved is not None:
+            self.link_cache.hits += 1
+            if self._lookups is not None:
+                self._lookups.update(name for name in (value, alias) if name)
+            return resolved
+        self.link_cache.misses += 1
+        resolved = self._resolve_link(
+            runtime_exports, cur_level, value, doc_base, cut_idx, need_type, alias
+        )
+        self.link_cache.links[key] = resolved
+        return resolved
+
+    def _resolve_link(
+        self,
+        runtime_exports,
+        cur_level,
+        value,
+        doc_base,
+        cut_idx,
+        need_type,
+        alias,
     ):
         link = None
         full_name = None
@@ -367,15 +660,10 @@ class MarkdownRenderer:
             export_type = list(info.values())[0]
             if need_type and export_type in ["method", "function", "module"]:
                 link = None
-        elif (
-            runtime_module
-            and (runtime_exp := getattr(runtime_module, value, Return)) is not Return
-        ):
-            export_type = check_type(runtime_exp)
-            if export_type == "module":
-                link = runtime_exp.__name__
-            else:
-                link = runtime_exp.__module__
+        elif runtime_exports and (runtime_exp := runtime_exports.get(value)):
+            export_type, link = runtime_exp
+            if link is None:
+                export_type = None
         else:
             export_type = None
         if export_type in ["class", "constant"]:
@@ -385,15 +673,21 @@ class MarkdownRenderer:
             flag += "-"
         if link == cur_level:
             link = f"#{flag}{(alias or value).lower()}"
-        elif link and link.split(".")[0] == doc_base:
+        elif link and (
+            (root := link.split(".")[0]) == doc_base or root in self.packages
+        ):
             link = handle_name_conflict(link)
             if export_type == "method":
                 link = os.sep.join(link.split(os.sep)[:-1])
+            if root != doc_base:
+                # a page of another package, rendered in a sibling directory
+                link = os.path.join("..", root, link)
             if cur_level := handle_name_conflict(cur_level):
                 if cut_idx == 0:
                     link = get_relative_path(cur_level, link)
                 else:
-                    cur_level = os.path.join(*cur_level.split(os.sep)[:cut_idx])
+                    # a page at the top of the output has no directory to cut
+                    cur_level = os.path.join("", *cur_level.split(os.sep)[:cut_idx])
                     link = get_relative_path(cur_level, link)
             if export_type != "module":
                 link += f"#{flag}{(alias or value).lower()}"
@@ -421,96 +715,83 @@ class MarkdownRenderer:
         return lines
 
     def render_class_details(self, cls: Class, level: int, aliases=None) -> list[str]:
+        return list(self.iter_class_details(cls, level, aliases))
+
+    def iter_class_details(self, cls: Class, level: int, aliases=None) -> Iterator[str]:
         """
         Render detailed documentation for a class including its signature, docstring details,
         its methods, and any nested classes.
         """
+        yield from without_last(self._iter_class_details(cls, level, aliases))
+
+    def _iter_class_details(self, cls: Class, level: int, aliases) -> Iterator[str]:
         # runtime_module = try_import_module('.'.join(cls.fully_qualified_name.split('.')[:-1]))
         # runtime_cls = getattr(runtime_module, cls.name, Return)
-        lines: list[str] = []
         header_prefix = "#" * level
-        lines.append(f"{header_prefix} {CLASS_FLAG} {escaped_markdown(cls.name)}")
-        lines.append("")
-        with auto_fold(escaped_markdown(cls.name), lines):
-            lines.append("```python")
-            constants = [
-                "\n" + self._render_constant(c, indent=1) for c in cls.constants
-            ]
-            lines.append(
-                format_signature(
-                    "".join([*cls.decorator_list, cls.signature, *constants])
-                )
-            )
-            lines.append("```")
-        lines.append("")
+        yield f"{header_prefix} {CLASS_FLAG} {escaped_markdown(cls.name)}"
+        yield ""
+        yield from fold(
+            escaped_markdown(cls.name),
+            ["```python", format_signature(self._class_code(cls)), "```"],
+        )
+        yield ""
         if cls.docstring:
-            lines.extend(
-                self.render_docstring(
-                    cls.docstring,
-                    cls.fully_qualified_name,
-                    "class",
-                    alias=aliases.get(cls.name, None),
-                )
+            yield from self.render_docstring(
+                cls.docstring,
+                cls.fully_qualified_name,
+                "class",
+                alias=aliases.get(cls.name, None),
             )
-            lines.append("")
+            yield ""
         if cls.functions:
-            lines.append("")
+            yield ""
             for func in cls.functions:
-                lines.extend(
-                    self.render_function(
-                        func,
-                        level=level + 1,
-                        flag=METHOD_FLAG,
-                        alias=aliases.get(func.name, None),
-                    )
+                yield from self.iter_function(
+                    func,
+                    level=level + 1,
+                    flag=METHOD_FLAG,
+                    alias=aliases.get(func.name, None),
                 )
-            lines.append("")
+            yield ""
         if cls.classes:
             # Flatten all nested classes in this class.
             for nested in cls.classes:
-                lines.extend(self.render_class_details(nested, level=level))
-            lines.append("")
-        lines.pop()
-        return lines
+                yield from self.iter_class_details(nested, level=level, aliases=aliases)
+            yield ""
 
     def render_function(
         self, func: Function, level: int, flag=FUNC_FLAG, alias=None
     ) -> list[str]:
+        return list(self.iter_function(func, level, flag, alias))
+
+    def iter_function(
+        self, func: Function, level: int, flag=FUNC_FLAG, alias=None
+    ) -> Iterator[str]:
         """
         Render detailed documentation for a function/method including its signature and
         docstring details (parameters, returns, raises, etc.).
         """
-        lines: list[str] = []
         header_prefix = "#" * level
-        lines.append(f"{header_prefix} {flag} {escaped_markdown(func.name, False)}")
-        lines.append("")
-        with auto_fold(escaped_markdown(func.name), lines):
-            lines.append("```python")
-            lines.append(
-                format_signature(
-                    func.body or "".join([*func.decorator_list, func.signature])
-                )
-            )
-            lines.append("```")
-        lines.append("")
+        yield f"{header_prefix} {flag} {escaped_markdown(func.name, False)}"
+        yield ""
+        yield from fold(
+            escaped_markdown(func.name),
+            ["```python", format_signature(self._function_code(func)), "```"],
+        )
         if func.docstring:
-            lines.extend(
-                self.render_docstring(
-                    func.docstring,
-                    func.fully_qualified_name,
-                    "function" if flag == FUNC_FLAG else "method",
-                    alias=alias,
-                )
+            yield ""
+            yield from self.render_docstring(
+                func.docstring,
+                func.fully_qualified_name,
+                "function" if flag == FUNC_FLAG else "method",
+                alias=alias,
             )
-            lines.append("")
-        lines.pop()
-        return lines
 
-    def _try_link(self, text, cur_fq_name, runtime_module=None, cut_idx=0, alias=None):
+    def _try_link(self, text, cur_fq_name, runtime_exports=None, cut_idx=0, alias=None):
         def _inner(t):
             t = t.strip()
             link, _, full_name = self._cross_file_link(
-                runtime_module=runtime_module,
+                runtime_exports=runtime_exports,
                 cur_level=cur_fq_name,
                 value=t.strip(),
                 doc_base=cur_fq_name.split(".")[0],
@@ -522,27 +803,10 @@ class MarkdownRenderer:
                 return t
             return f"[{full_name or t}]({link})"
 
-        def _compare_position(s):
-            bracket_pos = s.find("[")
-            comma_pos = s.find(",")
-            if bracket_pos != -1 and comma_pos != -1 and comma_pos < bracket_pos:
-                return False
-            return True
-
-        def _parse_nested_ann(anno: str):
-            if "[" in anno and _compare_position(anno):
-                annos = anno.split("[")
-                prefix = _inner(annos[0].strip())
-                suffix = "[".join(annos[1:]).rstrip("]")
-                suffix = _parse_nested_ann(suffix)
-                return f"{prefix}[{suffix}]"
-            elif "|" in anno:
-                return " | ".join(_parse_nested_ann(a.strip()) for a in anno.split("|"))
-            elif "," in anno:
-                return ", ".join(_parse_nested_ann(a.strip()) for a in anno.split(","))
-            return _inner(anno.strip())
-
-        return _parse_nested_ann(text)
+        return "".join(
+            _inner(token) if is_name else token
+            for is_name, token in tokenize_annotation(text)
+        )
 
     def render_docstring(
         self,
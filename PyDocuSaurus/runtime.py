@@ -0,0 +1,114 @@
+"""
+Runtime introspection of package exports, done in a separate worker process.
+
+Importing a package can be slow and memory hungry, so the documented package is
+never imported by the generator itself. A worker process imports the module,
+looks up the exported names and returns, for each of them, its kind and the
+module defining it. The worker is started on first use and killed if an import
+takes longer than the timeout.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from . import constants, profiling
+
+if TYPE_CHECKING:
+    from multiprocessing.pool import Pool
+
+    from .cache import BuildCache
+
+# export name: (kind, name of the module defining it)
+RuntimeExports = dict[str, tuple[str, str | None]]
+
+
+def check_type(obj):
+    import inspect
+
+    if inspect.ismodule(obj):
+        return "module"
+    elif inspect.isclass(obj):
+        return "class"
+    elif inspect.ismethod(obj):
+        return "method"
+    elif inspect.isfunction(obj):
+        return "function"
+    else:
+        return "constant"
+
+
+def try_import_module(module_name: str):
+    import importlib
+
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        print("import error", e)
+        return None
+
+
+def inspect_exports(module_name: str, names: list[str]) -> RuntimeExports | None:
+    """Import a module and describe the given names, run inside the worker."""
+    module = try_import_module(module_name)
+    if module is None:
+        return None
+    exports: RuntimeExports = {}
+    for name in names:
+        try:
+            obj = getattr(module, name)
+        except AttributeError:
+            continue
+        kind = check_type(obj)
+        if kind == "module":
+            exports[name] = (kind, obj.__name__)
+        else:
+            exports[name] = (kind, getattr(obj, "__module__", None))
+    return exports
+
+
+class RuntimeInspector:
+    """Looks up exports in a worker process, caching the results in a build cache."""
+
+    def __init__(
+        self,
+        cache: BuildCache | None = None,
+        timeout: float | None = None,
+    ):
+        self.cache = cache
+        self.timeout = constants.IMPORT_TIMEOUT if timeout is None else timeout
+        self._pool: Pool | None = None
+
+    def exports(self, module_name: str, names: list[str]) -> RuntimeExports | None:
+        """Kind and defining module of the exported names, None if the import failed."""
+        key = None
+        if self.cache is not None:
+            key = self.cache.runtime_key(module_name, names)
+            found, exports = self.cache.load_runtime(key)
+            if found:
+                return exports
+        import multiprocessing
+
+        if self._pool is None:
+            # a fresh interpreter, so nothing imported by the generator leaks in
+            self._pool = multiprocessing.get_context("spawn").Pool(1)
+        result = self._pool.apply_async(inspect_exports, (module_name, names))
+        try:
+            with profiling.phase("runtime import"):
+                exports = result.get(self.timeout)
+        except multiprocessing.TimeoutError:
+            print(f"import error: importing {module_name} timed out")
+            self.close()
+            return None
+        except Exception as e:  # noqa: BLE001
+            print("import error", e)
+            return None
+        if key is not None:
+            self.cache.store_runtime(key, exports)
+        return exports
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
@@ -0,0 +1,147 @@
+"""
+Index of the documented symbols of a package, used to resolve cross-links.
+
+Every crawl owns its own index, so crawling several packages (or the same one
+twice) in one process never mixes their symbols.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .models import Module
+
+# symbol types whose link target is their parent instead of the symbol itself
+_LINKED_TO_PARENT = ("function", "method")
+
+
+class SymbolIndex:
+    """Symbols of a package by short name, fully qualified name and module prefix.
+
+    A short name maps to the targets it links to, in registration order. The target
+    of a class or constant is its fully qualified name, the target of a function or
+    method is the fully qualified name of the module or class defining it.
+    """
+
+    def __init__(self):
+        self._by_name: dict[str, dict[str, str]] = {}
+        self._by_fq_name: dict[str, str] = {}
+        self._by_prefix: dict[str, list[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_fq_name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    def names(self) -> Iterator[str]:
+        return iter(self._by_name)
+
+    def add(self, name: str, target: str, type: str) -> None:
+        """Register a symbol by its short name, link target and type."""
+        targets = self._by_name.setdefault(name, {})
+        targets[target] = type
+        fq_name = f"{target}.{name}" if type in _LINKED_TO_PARENT else target
+        if fq_name in self._by_fq_name:
+            self._by_fq_name[fq_name] = type
+            return
+        self._by_fq_name[fq_name] = type
+        parts = fq_name.split(".")
+        for idx in range(1, len(parts)):
+            self._by_prefix.setdefault(".".join(parts[:idx]), []).append(fq_name)
+
+    def add_module(self, module: Module) -> None:
+        """Register the constants, functions, classes and methods of a module."""
+        for const in module.constants:
+            self.add(const.name, const.fully_qualified_name, "constant")
+        for func in module.functions:
+            self.add(func.name, module.fully_qualified_name, "function")
+        classes = list(module.classes)
+        while classes:
+            cls = classes.pop()
+            self.add(cls.name, cls.fully_qualified_name, "class")
+            for method in cls.functions:
+                self.add(method.name, cls.fully_qualified_name, "method")
+            classes.extend(cls.classes)
+
+    def get(self, name: str) -> dict[str, str] | None:
+        """Link targets of a short name together with their types."""
+        return self._by_name.get(name)
+
+    def type_of(self, fq_name: str) -> str | None:
+        """Type of the symbol with the given fully qualified name."""
+        return self._by_fq_name.get(fq_name)
+
+    def within(self, prefix: str) -> list[str]:
+        """Fully qualified names of the symbols below a module or class."""
+        return list(self._by_prefix.get(prefix, ()))
+
+    def resolve(self, name: str, target: str) -> dict[str, str] | None:
+        """The link target of a short name, preferring the given target.
+
+        A name registered once resolves to that symbol. An ambiguous name only
+        resolves to the given target if it is one of its targets, otherwise to nothing.
+        """
+        targets = self._by_name.get(name)
+        if targets is None or len(targets) == 1:
+            return targets
+        if target in targets:
+            return {target: targets[target]}
+        return None
+
+    def changed_names(self, other: SymbolIndex) -> set[str]:
+        """Short names whose targets differ between this index and other."""
+        return {
+            name
+            for name in self._by_name.keys() | other._by_name.keys()
+            if self._by_name.get(name) != other._by_name.get(name)
+        }
+
+    def digest(self) -> str:
+        """Digest of all symbols, used to detect changed cross-link targets."""
+        digest = hashlib.sha256()
+        for name in sorted(self._by_name):
+            for target, type in sorted(self._by_name[name].items()):
+                digest.update(f"{name}:{target}:{type}".encode())
+                digest.update(b"\0")
+        return digest.hexdigest()
+
+    def resolve_export(
+        self, modules: dict[str, Module], module_name: str, name: str
+    ) -> tuple[str, str] | None:
+        """Kind and defining module of a name exported by a module, found statically.
+
+        Imports are followed through the modules of the package, including star
+        imports, until the module defining the name is found. Names defined outside
+        of the package are not resolved.
+        """
+        seen: set[tuple[str, str]] = set()
+        while (module_name, name) not in seen:
+            seen.add((module_name, name))
+            module = modules.get(module_name)
+            if module is None:
+                return None
+            fq_name = f"{module_name}.{name}"
+            type = self._by_fq_name.get(fq_name)
+            if type is not None:
+                return type, module_name
+            if fq_name in modules:
+                return "module", fq_name
+            target = module.imports.get(name)
+            if target is None:
+                for source in module.star_imports:
+                    if found := self.resolve_export(modules, source, name):
+                        return found
+                return None
+            if target in modules:
+                return "module", target
+            module_name, _, name = target.rpartition(".")
+        return None
+
+    def clear(self) -> None:
+        self._by_name.clear()
+        self._by_fq_name.clear()
+        self._by_prefix.clear()
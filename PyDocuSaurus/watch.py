@@ -0,0 +1,154 @@
+"""
+Watch mode: keep the documentation of a package up to date while it is edited.
+
+The package directory is polled for changed module files. Only those files are
+parsed again, the symbol table is rebuilt from the modules kept in memory and
+only the pages of the changed modules, plus the pages that looked up one of the
+changed symbol names, are rendered again.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .discover import ExcludePatterns, ModuleFile, discover_modules
+from .models import Module, Package
+from .parse import parse_module_source
+from .render import MarkdownRenderer
+from .symbols import SymbolIndex
+
+if TYPE_CHECKING:
+    from .cache import BuildCache
+
+DEFAULT_INTERVAL = 0.1
+
+
+def _stamp(file: ModuleFile) -> tuple[int, int] | None:
+    try:
+        stat = file.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class PackageWatcher:
+    """Incrementally rebuilds the documentation of a package after its files change."""
+
+    def __init__(
+        self,
+        package: Package,
+        output_path: Path,
+        renderer: MarkdownRenderer,
+        include_private: bool = False,
+        use_runtime: bool = True,
+        cache: BuildCache | None = None,
+        stream: bool = False,
+        exclude: Sequence[str] = (),
+    ):
+        self.package = package
+        self.output_path = output_path
+        self.renderer = renderer
+        self.include_private = include_private
+        self.use_runtime = use_runtime
+        self.cache = cache
+        self.stream = stream
+        self.modules: dict[Path, Module] = {
+            module.path: module for module in package.modules
+        }
+        self.exclude = ExcludePatterns.for_package(package.path, exclude)
+        self.stamps = {file.path: _stamp(file) for file in self._entries()}
+
+    def _entries(self) -> list[ModuleFile]:
+        init_py = self.package.path / "__init__.py"
+        if not init_py.is_file():
+            return []
+        return discover_modules(
+            init_py,
+            self.package.fully_qualified_name,
+            self.include_private,
+            self.exclude,
+        )
+
+    def update(self) -> list[str] | None:
+        """Rebuild the pages affected by changed files, returns their module names."""
+        entries = self._entries()
+        stamps = {file.path: _stamp(file) for file in entries}
+        if stamps == self.stamps:
+            return None
+        changed: set[str] = set()
+        modules: list[Module] = []
+        for file in entries:
+            path, name = file.path, file.name
+            module = self.modules.get(path)
+            if (
+                module is None
+                or stamps[path] != self.stamps.get(path)
+                or module.fully_qualified_name != name
+            ):
+                try:
+                    source = path.read_text(encoding="utf8")
+                    module = parse_module_source(
+                        source, path, name, self.include_private
+                    )
+                except (OSError, SyntaxError, UnicodeDecodeError) as e:
+                    print(f"Error while parsing {path}: {e}")
+                    if module is None:
+                        continue
+                else:
+                    changed.add(name)
+                    if self.cache is not None:
+                        key = self.cache.module_key(
+                            path, source, name, self.include_private
+                        )
+                        self.cache.store_module(key, module)
+            modules.append(module)
+        self.stamps = stamps
+        self.modules = {module.path: module for module in modules}
+
+        # rebuild the module tree and the symbol table in the order of a full build
+        by_path = {file.path: idx for idx, file in enumerate(entries)}
+        for module in modules:
+            module.submodules = []
+        for module in modules:
+            parent = entries[by_path[module.path]].parent
+            if parent >= 0 and entries[parent].path in self.modules:
+                self.modules[entries[parent].path].submodules.append(module)
+        symbols = SymbolIndex()
+        for module in modules:
+            symbols.add_module(module)
+        changed_symbols = symbols.changed_names(self.package.symbols)
+        self.package.symbols = symbols
+
+        names = {module.fully_qualified_name for module in modules}
+        removed = {m.fully_qualified_name for m in self.package.modules} - names
+        self.package.modules = sorted(modules, key=lambda m: m.fully_qualified_name)
+        for name, lookups in self.renderer.page_lookups.items():
+            if lookups is None or lookups & changed_symbols or removed:
+                changed.add(name)
+        changed &= names
+        self.renderer.render(
+            self.package,
+            self.output_path,
+            self.use_runtime,
+            cache=self.cache,
+            stream=self.stream,
+            only=changed,
+        )
+        return sorted(changed)
+
+    def watch(self, interval: float = DEFAULT_INTERVAL) -> None:
+        """Poll the package every interval seconds until interrupted."""
+        print(f"Watching {self.package.path} for changes, press Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(interval)
+                start = time.perf_counter()
+                changed = self.update()
+                if changed is not None:
+                    elapsed = (time.perf_counter() - start) * 1000
+                    print(f"Rendered {len(changed)} pages in {elapsed:.0f} ms")
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,164 @@
+"""
+Writing of the generated Markdown files.
+
+Files whose content did not change are left untouched, so that watchers of the
+output directory (e.g. the Docusaurus dev server) only see real changes. Changed
+files are written by a thread pool through a temporary file that is renamed into
+place. A manifest of the generated files lets the next run delete the pages of
+modules that no longer exist.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from . import profiling
+
+MANIFEST_NAME = ".pdocs-manifest.json"
+
+
+@dataclass
+class WriteStats:
+    written: int = 0
+    skipped: int = 0
+    deleted: int = 0
+
+    def add(self, other: WriteStats) -> None:
+        self.written += other.written
+        self.skipped += other.skipped
+        self.deleted += other.deleted
+
+    def __str__(self) -> str:
+        return (
+            f"{self.written} files written, {self.skipped} unchanged, "
+            f"{self.deleted} deleted"
+        )
+
+
+def _digest(path: Path) -> str | None:
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 16), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def _tmp_path(file_path: Path) -> Path:
+    # unique per thread, two writes may target the same file
+    suffix = f"{os.getpid()}.{threading.get_ident()}.tmp"
+    return file_path.with_name(f"{file_path.name}.{suffix}")
+
+
+def write_if_changed(file_path: Path, text: str) -> bool:
+    """Write text to file_path unless the file already holds exactly this content."""
+    with profiling.phase("write"):
+        return _write_if_changed(file_path, text)
+
+
+def _write_if_changed(file_path: Path, text: str) -> bool:
+    data = text.encode("utf8")
+    try:
+        if file_path.stat().st_size == len(data) and _digest(file_path) == (
+            hashlib.sha256(data).hexdigest()
+        ):
+            return False
+    except OSError:
+        pass
+    tmp_path = _tmp_path(file_path)
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, file_path)
+    return True
+
+
+def stream_if_changed(file_path: Path, chunks: Iterable[str]) -> bool:
+    """Write chunks to file_path through a temporary file, keeping an identical file."""
+    tmp_path = _tmp_path(file_path)
+    digest = hashlib.sha256()
+    try:
+        with open(tmp_path, "wb") as file:
+            for chunk in chunks:
+                data = chunk.encode("utf8")
+                digest.update(data)
+                file.write(data)
+        if _digest(file_path) == digest.hexdigest():
+            return False
+        os.replace(tmp_path, file_path)
+        return True
+    finally:
+        # also when the chunks raise, no partial file is left in the output tree
+        tmp_path.unlink(missing_ok=True)
+
+
+class OutputWriter:
+    """Writes the files of one render below ``output_path`` and counts them."""
+
+    def __init__(self, output_path: Path, max_workers: int | None = None):
+        self.output_path = output_path
+        self.stats = WriteStats()
+        self.files: set[str] = set()
+        self._executor = ThreadPoolExecutor(max_workers)
+        self._futures: list[Future[bool]] = []
+
+    def _register(self, file_path: Path) -> None:
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        self.files.add(file_path.relative_to(self.output_path).as_posix())
+
+    def _count(self, written: bool) -> None:
+        if written:
+            self.stats.written += 1
+        else:
+            self.stats.skipped += 1
+
+    def write(self, file_path: Path, text: str) -> None:
+        """Write text to file_path in the background."""
+        self._register(file_path)
+        self._futures.append(self._executor.submit(write_if_changed, file_path, text))
+
+    def keep(self, file_path: Path) -> None:
+        """Keep a file of an earlier run that is not written again."""
+        self.files.add(file_path.relative_to(self.output_path).as_posix())
+
+    def stream(self, file_path: Path, chunks: Iterable[str]) -> None:
+        """Write chunks to file_path as they are generated."""
+        self._register(file_path)
+        self._count(stream_if_changed(file_path, chunks))
+
+    def close(self) -> WriteStats:
+        """Wait for pending writes and delete files generated only by earlier runs."""
+        self._executor.shutdown()
+        for future in self._futures:
+            self._count(future.result())
+        self._futures.clear()
+        manifest_path = self.output_path / MANIFEST_NAME
+        try:
+            previous = json.loads(manifest_path.read_text(encoding="utf8"))
+        except (OSError, ValueError):
+            previous = []
+        output_path = self.output_path.resolve()
+        for name in set(previous) - self.files:
+            path = self.output_path / name
+            # a manifest entry never reaches outside the output directory
+            if not path.resolve().is_relative_to(output_path):
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            self.stats.deleted += 1
+            # remove directories left empty, up to the output directory
+            for parent in path.parents:
+                if parent == self.output_path or any(parent.iterdir()):
+                    break
+                parent.rmdir()
+        write_if_changed(manifest_path, json.dumps(sorted(self.files), indent=0))
+        return self.stats
@@ -0,0 +1,90 @@
+"""
+Micro-benchmark of escaped_markdown on the docstrings of this repository.
+
+Compares the ``str.replace`` based implementation with the generator and
+``"".join`` implementation it replaced and with a ``str.translate`` table. Run
+from the repository root with ``python -m benchmarks.bench_escape``.
+"""
+
+import ast
+import timeit
+from pathlib import Path
+
+from PyDocuSaurus.render import (
+    _MARKDOWN_CHARACTERS_TO_ESCAPE,
+    _MARKDOWN_CHARACTERS_TO_ESCAPE_SIMPLE,
+    escaped_markdown,
+)
+
+ROOT = Path(__file__).parent.parent
+_TABLE = str.maketrans({c: f"\\{c}" for c in _MARKDOWN_CHARACTERS_TO_ESCAPE})
+_TABLE_SIMPLE = str.maketrans(
+    {c: f"\\{c}" for c in _MARKDOWN_CHARACTERS_TO_ESCAPE_SIMPLE}
+)
+
+
+def escaped_markdown_join(text: str, simple=True) -> str:
+    characters = (
+        _MARKDOWN_CHARACTERS_TO_ESCAPE_SIMPLE
+        if simple
+        else _MARKDOWN_CHARACTERS_TO_ESCAPE
+    )
+    return "".join(f"\\{c}" if c in characters else c for c in text.strip())
+
+
+def escaped_markdown_translate(text: str, simple=True) -> str:
+    return text.strip().translate(_TABLE_SIMPLE if simple else _TABLE)
+
+
+def load_texts() -> list[str]:
+    """Docstrings and names of the package and of the sample package."""
+    texts = []
+    paths = [
+        *ROOT.glob("PyDocuSaurus/*.py"),
+        *ROOT.glob("tests/sample_package/**/*.py"),
+    ]
+    for path in paths:
+        for node in ast.walk(ast.parse(path.read_text(encoding="utf8"))):
+            if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                texts.append(node.name)
+            if isinstance(
+                node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+            ) and (docstring := ast.get_docstring(node)):
+                texts.append(docstring)
+    return texts
+
+
+def bench(func, texts: list[str], number: int) -> float:
+    def run():
+        for text in texts:
+            func(text, True)
+            func(text, False)
+
+    return min(timeit.repeat(run, number=number, repeat=5)) / number
+
+
+def main():
+    texts = load_texts()
+    implementations = {
+        "join": escaped_markdown_join,
+        "translate": escaped_markdown_translate,
+        "replace": escaped_markdown,
+    }
+    for text in texts:
+        for simple in (True, False):
+            expected = escaped_markdown_join(text, simple)
+            for func in implementations.values():
+                assert func(text, simple) == expected
+    number = 50
+    print(f"{len(texts)} texts, {sum(map(len, texts))} characters")
+    baseline = None
+    for name, func in implementations.items():
+        elapsed = bench(func, texts, number)
+        baseline = baseline or elapsed
+        print(
+            f"{name:<10} {elapsed * 1000:8.3f} ms per pass ({baseline / elapsed:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
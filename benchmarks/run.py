@@ -0,0 +1,260 @@
+"""
+Benchmark of crawling and rendering a synthetic package.
+
+Generates a package with :mod:`benchmarks.synthetic`, then times ``crawl_package``
+and ``MarkdownRenderer.render`` and its phases, keeping the fastest of several
+repeats. Peak memory is measured with tracemalloc in a separate run, so that
+tracing does not slow down the timed runs. The results are printed as JSON,
+to be compared across commits::
+
+    python -m benchmarks.run --modules 200 --output results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from dataclasses import asdict
+from pathlib import Path
+
+from PyDocuSaurus import constants, crawl_package
+from PyDocuSaurus.formatter import FORMAT_MEMO, FORMATTERS
+from PyDocuSaurus.parse import DOCSTRING_MEMO, DOCSTRING_STYLES
+from PyDocuSaurus.render import MarkdownRenderer
+from PyDocuSaurus.writer import OutputWriter
+
+from .synthetic import STYLES, PackageSpec, generate_package
+
+
+class PhaseTimer:
+    """Adds the time spent in wrapped methods to named phases."""
+
+    def __init__(self):
+        self.times: dict[str, float] = defaultdict(float)
+        self._patched: list[tuple[object, str, object]] = []
+
+    def wrap(self, owner: object, attribute: str, phase: str) -> None:
+        """Time calls of owner.attribute until :meth:`restore` is called."""
+        method = getattr(owner, attribute)
+        # a method of an instance lives on its class, there is nothing to put back
+        original = vars(owner).get(attribute) if isinstance(owner, type) else None
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.times[phase] += time.perf_counter() - start
+
+        setattr(owner, attribute, timed)
+        self._patched.append((owner, attribute, original))
+
+    def restore(self) -> None:
+        for owner, attribute, original in reversed(self._patched):
+            if original is None:
+                delattr(owner, attribute)
+            else:
+                setattr(owner, attribute, original)
+        self._patched.clear()
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def run_once(
+    package_path: Path, output_path: Path, use_runtime: bool
+) -> dict[str, float]:
+    """Crawl and render the package once, returns the time of each phase."""
+    FORMAT_MEMO.clear()
+    DOCSTRING_MEMO.clear()
+    start = time.perf_counter()
+    package = crawl_package(package_path)
+    crawl = time.perf_counter() - start
+
+    renderer = MarkdownRenderer()
+    timer = PhaseTimer()
+    timer.wrap(renderer, "_load_page", "load_pages")
+    timer.wrap(renderer, "_prefetch_snippets", "prefetch_snippets")
+    timer.wrap(renderer, "render_module", "render_pages")
+    timer.wrap(OutputWriter, "close", "write")
+    # like pdocs, which drops the memo before rendering without keeping docstrings
+    DOCSTRING_MEMO.drop_entries()
+    try:
+        start = time.perf_counter()
+        renderer.render(package, output_path, use_runtime, keep_docstrings=False)
+        render = time.perf_counter() - start
+    finally:
+        timer.restore()
+    return {
+        "crawl": crawl,
+        # docstring parsing happens while crawling, so it is part of crawl
+        "parse_docstrings": DOCSTRING_MEMO.miss_time,
+        "render": render,
+        **timer.times,
+        # formatting happens while pages are rendered, so it is part of render_pages
+        "format": FORMAT_MEMO.miss_time,
+    }
+
+
+def measure_memory(
+    package_path: Path, output_path: Path, use_runtime: bool
+) -> dict[str, float]:
+    """Peak memory in MiB allocated while crawling and while rendering.
+
+    ``package`` is the memory still held by the crawled package when rendering
+    starts, mostly its models.
+    """
+    FORMAT_MEMO.clear()
+    DOCSTRING_MEMO.clear()
+    tracemalloc.start()
+    try:
+        package = crawl_package(package_path)
+        retained, crawl = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        DOCSTRING_MEMO.drop_entries()
+        MarkdownRenderer().render(
+            package, output_path, use_runtime, keep_docstrings=False
+        )
+        render = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "crawl": crawl / 2**20,
+        "package": retained / 2**20,
+        "render": render / 2**20,
+    }
+
+
+def run(
+    spec: PackageSpec, repeat: int = 3, use_runtime: bool = False, memory: bool = True
+) -> dict:
+    """Benchmark the given synthetic package, returns the results."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        package_path = generate_package(root / "src", spec)
+        files = sum(1 for _ in package_path.rglob("*.py"))
+        runs = [
+            run_once(package_path, root / f"docs{idx}", use_runtime)
+            for idx in range(repeat)
+        ]
+        peak_memory = (
+            measure_memory(package_path, root / "docs_memory", use_runtime)
+            if memory
+            else None
+        )
+        pages = sum(1 for _ in (root / "docs0").rglob("*.md"))
+    return {
+        "spec": asdict(spec),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "formatter": constants.FORMATTER,
+        "docstring_style": constants.DOCSTRING_STYLE,
+        "docstring_memo_size": DOCSTRING_MEMO.maxsize,
+        "runtime": use_runtime,
+        "repeat": repeat,
+        "files": files,
+        "pages": pages,
+        # the fastest run is the least disturbed by the rest of the machine
+        "seconds": {
+            phase: min(times.get(phase, 0.0) for times in runs) for phase in runs[0]
+        },
+        "peak_memory_mib": peak_memory,
+    }
+
+
+def main():
+    defaults = PackageSpec()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--modules", type=int, default=defaults.modules)
+    parser.add_argument(
+        "--classes", type=int, default=defaults.classes, help="Classes per module"
+    )
+    parser.add_argument(
+        "--methods", type=int, default=defaults.methods, help="Methods per class"
+    )
+    parser.add_argument(
+        "--functions", type=int, default=defaults.functions, help="Functions per module"
+    )
+    parser.add_argument(
+        "--constants", type=int, default=defaults.constants, help="Constants per module"
+    )
+    parser.add_argument(
+        "--depth", type=int, default=defaults.depth, help="Subpackage nesting depth"
+    )
+    parser.add_argument(
+        "--styles",
+        nargs="+",
+        choices=STYLES,
+        default=list(defaults.styles),
+        help="Docstring styles, used round robin",
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--runtime", action="store_true", help="Use runtime information"
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="Skip the peak memory run, which is slow because of tracing",
+    )
+    parser.add_argument(
+        "--formatter", choices=sorted(FORMATTERS), default=constants.FORMATTER
+    )
+    parser.add_argument(
+        "--docstring-style",
+        choices=list(DOCSTRING_STYLES),
+        default=constants.DOCSTRING_STYLE,
+    )
+    parser.add_argument(
+        "--docstring-memo-size",
+        type=int,
+        default=DOCSTRING_MEMO.maxsize,
+        help="Parsed docstrings kept in memory, 0 parses every docstring",
+    )
+    parser.add_argument(
+        "--output", type=Path, help="Write the JSON results to this file"
+    )
+    args = parser.parse_args()
+
+    constants.FORMATTER = args.formatter
+    constants.DOCSTRING_STYLE = args.docstring_style
+    DOCSTRING_MEMO.maxsize = args.docstring_memo_size
+    spec = PackageSpec(
+        modules=args.modules,
+        classes=args.classes,
+        methods=args.methods,
+        functions=args.functions,
+        constants=args.constants,
+        depth=args.depth,
+        styles=tuple(args.styles),
+        seed=args.seed,
+    )
+    results = json.dumps(
+        run(spec, max(args.repeat, 1), args.runtime, not args.no_memory), indent=2
+    )
+    if args.output is None:
+        print(results)
+    else:
+        args.output.write_text(results + "\n", encoding="utf8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Generator of synthetic packages for the benchmarks.
+
+The generated package is a chain of nested subpackages, ``depth`` levels deep,
+over which the modules are spread round robin. Every module defines constants,
+functions and classes with methods, documented in one of the docstring styles
+supported by ``docstring_parser``, and annotated with classes of other modules so
+that cross-links have to be resolved. Every package re-exports the first class of
+each of its modules through ``__all__``.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+STYLES = ("google", "numpy", "rest", "epydoc")
+
+
+@dataclass
+class PackageSpec:
+    name: str = "synthetic"
+    modules: int = 50
+    classes: int = 5
+    methods: int = 8
+    functions: int = 5
+    constants: int = 10
+    depth: int = 3
+    styles: tuple[str, ...] = STYLES
+    seed: int = 0
+
+
+def _docstring(
+    style: str, summary: str, params: list[tuple[str, str]], indent: str
+) -> str:
+    lines = [
+        f"{summary}.",
+        "",
+        "A longer description with `code`, *emphasis* and [brackets].",
+    ]
+    if params:
+        lines.append("")
+        if style == "google":
+            lines.append("Args:")
+            lines.extend(
+                f"    {name} ({type}): The {name} value." for name, type in params
+            )
+            lines += ["", "Returns:", "    bool: Whether it worked."]
+        elif style == "numpy":
+            lines += ["Parameters", "----------"]
+            for name, type in params:
+                lines += [f"{name} : {type}", f"    The {name} value."]
+            lines += ["", "Returns", "-------", "bool", "    Whether it worked."]
+        elif style == "rest":
+            for name, type in params:
+                lines += [f":param {name}: The {name} value.", f":type {name}: {type}"]
+            lines += [":returns: Whether it worked.", ":rtype: bool"]
+        else:
+            for name, type in params:
+                lines += [f"@param {name}: The {name} value.", f"@type {name}: {type}"]
+            lines += ["@return: Whether it worked.", "@rtype: bool"]
+    body = "\n".join(f"{indent}{line}" if line else "" for line in lines[1:])
+    return f'{indent}"""{lines[0]}\n{body}\n{indent}"""\n'
+
+
+def _module_source(
+    spec: PackageSpec,
+    index: int,
+    style: str,
+    others: list[tuple[str, str]],
+    rng: random.Random,
+) -> str:
+    """Source of module number index, others are (module, class) pairs to link to."""
+    parts = [f'"""Synthetic module {index}, documented in {style} style."""\n\n']
+    imports = sorted({module for module, _ in others})
+    parts.extend(f"from {module} import *  # noqa: F403\n" for module in imports)
+    parts.append("\n")
+    for idx in range(spec.constants):
+        parts.append(
+            f"CONSTANT_{index}_{idx} = {{'key': {idx}, 'values': [{idx}, {idx + 1}]}}\n"
+        )
+        parts.append(f"# Constant number {idx} of module {index}\n")
+    for idx in range(spec.functions):
+        other = rng.choice(others)[1] if others else "int"
+        params = [("first", other), ("second", "dict[str, list[int]]")]
+        parts.append(
+            f"\n\ndef function_{index}_{idx}(first: {other}, second: dict[str, list[int]]"
+            f" | None = None, *args, **kwargs) -> bool:\n"
+        )
+        parts.append(_docstring(style, f"Function {idx}", params, "    "))
+        parts.append("    return True\n")
+    for idx in range(spec.classes):
+        base = rng.choice(others)[1] if others and idx % 2 else "object"
+        parts.append(f"\n\nclass Class_{index}_{idx}({base}):\n")
+        parts.append(_docstring(style, f"Class {idx}", [], "    "))
+        parts.append(f"\n    ATTRIBUTE: int = {idx}\n")
+        for method in range(spec.methods):
+            other = rng.choice(others)[1] if others else "int"
+            params = [("value", other), ("flag", "bool")]
+            parts.append(
+                f"\n    def method_{method}(self, value: {other}, flag: bool = False)"
+                f" -> list[Class_{index}_{idx}]:\n"
+            )
+            parts.append(_docstring(style, f"Method {method}", params, "        "))
+            parts.append("        return []\n")
+    return "".join(parts)
+
+
+def generate_package(root: Path, spec: PackageSpec) -> Path:
+    """Write the package described by spec below root, returns its directory."""
+    rng = random.Random(spec.seed)
+    depth = max(spec.depth, 1)
+    packages = [spec.name]
+    for level in range(1, depth):
+        packages.append(f"{packages[-1]}.sub{level}")
+    modules: dict[str, list[str]] = {package: [] for package in packages}
+    defined: list[tuple[str, str]] = []
+    for index in range(spec.modules):
+        package = packages[index % depth]
+        module = f"{package}.module_{index}"
+        # only link to modules written before, so that star imports have no cycles
+        others = rng.sample(defined, min(len(defined), 3))
+        style = spec.styles[index % len(spec.styles)]
+        path = root.joinpath(*module.split(".")).with_suffix(".py")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            _module_source(spec, index, style, others, rng), encoding="utf8"
+        )
+        modules[package].append(module)
+        if spec.classes:
+            defined.append((module, f"Class_{index}_0"))
+    for package in packages:
+        exports = [
+            (module, f"Class_{module.rpartition('_')[2]}_0")
+            for module in modules[package]
+        ]
+        lines = [f'"""Synthetic package {package}."""\n\n']
+        if spec.classes:
+            lines.extend(f"from {module} import {name}\n" for module, name in exports)
+            lines.append(f"\n__all__ = {[name for _, name in exports]!r}\n")
+        root.joinpath(*package.split("."), "__init__.py").write_text(
+            "".join(lines), encoding="utf8"
+        )
+    return root / spec.name
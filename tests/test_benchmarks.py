@@ -0,0 +1,26 @@
+from benchmarks.synthetic import PackageSpec, generate_package
+from PyDocuSaurus import crawl_package
+from PyDocuSaurus.render import MarkdownRenderer
+
+
+def test_synthetic_package(tmp_path):
+    spec = PackageSpec(
+        modules=6, classes=2, methods=2, functions=2, constants=2, depth=2
+    )
+    package_path = generate_package(tmp_path / "src", spec)
+    package = crawl_package(package_path)
+    names = {module.fully_qualified_name for module in package.modules}
+    assert names == {
+        "synthetic",
+        "synthetic.sub1",
+        *(f"synthetic.module_{idx}" for idx in (0, 2, 4)),
+        *(f"synthetic.sub1.module_{idx}" for idx in (1, 3, 5)),
+    }
+    assert package.symbols.get("Class_5_1") == {
+        "synthetic.sub1.module_5.Class_5_1": "class"
+    }
+
+    stats = MarkdownRenderer().render(package, tmp_path / "docs", use_runtime=False)
+    assert stats.written == 8
+    page = (tmp_path / "docs" / "module-2.md").read_text(encoding="utf8")
+    assert "function\\_2\\_0" in page
@@ -0,0 +1,66 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from PyDocuSaurus import constants, crawl_package, parse
+from PyDocuSaurus.cache import BuildCache
+
+SAMPLE_PACKAGE = Path(__file__).parent / "sample_package"
+
+
+@pytest.fixture
+def package_path(tmp_path):
+    path = tmp_path / "sample_package"
+    shutil.copytree(SAMPLE_PACKAGE, path, ignore=shutil.ignore_patterns("__pycache__"))
+    return path
+
+
+@pytest.fixture
+def parsed(monkeypatch) -> list[Path]:
+    """The files parsed from source, rather than loaded from the cache."""
+    parsed: list[Path] = []
+    parse_module_source = parse.parse_module_source
+
+    def counting_parse(source, file_path, *args):
+        parsed.append(file_path)
+        return parse_module_source(source, file_path, *args)
+
+    monkeypatch.setattr(parse, "parse_module_source", counting_parse)
+    return parsed
+
+
+def test_unchanged_package_is_loaded_from_cache(tmp_path, package_path, parsed):
+    first = crawl_package(package_path, cache=BuildCache(tmp_path / "cache"))
+    assert len(parsed) == len(first.modules)
+    parsed.clear()
+    second = crawl_package(package_path, cache=BuildCache(tmp_path / "cache"))
+    assert parsed == []
+    assert [module.fully_qualified_name for module in second.modules] == [
+        module.fully_qualified_name for module in first.modules
+    ]
+
+
+def test_edited_file_is_parsed_again(tmp_path, package_path, parsed):
+    crawl_package(package_path, cache=BuildCache(tmp_path / "cache"))
+    edited = package_path / "utils.py"
+    edited.write_text(edited.read_text() + "\nADDED = 1\n")
+    parsed.clear()
+    package = crawl_package(package_path, cache=BuildCache(tmp_path / "cache"))
+    assert parsed == [edited]
+    module = next(module for module in package.modules if module.path == edited)
+    assert "ADDED" in [constant.name for constant in module.constants]
+
+
+def test_parse_options_invalidate_cache(tmp_path, package_path, parsed, monkeypatch):
+    crawl_package(package_path, cache=BuildCache(tmp_path / "cache"))
+    parsed.clear()
+    package = crawl_package(
+        package_path, include_private=True, cache=BuildCache(tmp_path / "cache")
+    )
+    assert len(parsed) == len(package.modules)
+
+    parsed.clear()
+    monkeypatch.setattr(constants, "DOCSTRING_STYLE", "google")
+    crawl_package(package_path, cache=BuildCache(tmp_path / "cache"))
+    assert len(parsed) == len(package.modules)
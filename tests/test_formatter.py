@@ -0,0 +1,97 @@
+import pytest
+
+from PyDocuSaurus.cache import BuildCache
+from PyDocuSaurus.formatter import (
+    BlackFormatter,
+    FormatMemo,
+    NativeFormatter,
+    _black_mode,
+)
+
+SNIPPETS = [
+    "x = 1\n",
+    "def f(a, b=1, *args, **kwargs) -> int:\n    pass\n",
+    "def very_long_function_name(first_argument: int, second_argument: str = 'default') -> dict[str, int]:\n    pass\n",
+    "class Foo(Base, metaclass=Meta):\n    pass\n",
+    "VALUES = {'alpha': 1, 'beta': 2, 'gamma': 3, 'delta': 4, 'epsilon': 5, 'zeta': 6, 'eta': 7}\n",
+]
+
+
+def test_native_formatter():
+    formatter = NativeFormatter()
+    assert formatter.format(SNIPPETS[0], 80) == "x = 1\n"
+    assert formatter.format(SNIPPETS[2], 80) == (
+        "def very_long_function_name(\n"
+        "    first_argument: int, second_argument: str = 'default'\n"
+        ") -> dict[str, int]:\n"
+        "    pass\n"
+    )
+    assert formatter.format(SNIPPETS[4], 80) == (
+        "VALUES = {\n"
+        "    'alpha': 1,\n"
+        "    'beta': 2,\n"
+        "    'gamma': 3,\n"
+        "    'delta': 4,\n"
+        "    'epsilon': 5,\n"
+        "    'zeta': 6,\n"
+        "    'eta': 7,\n"
+        "}\n"
+    )
+
+
+def test_native_formatter_keeps_invalid_code():
+    assert NativeFormatter().format("def f(:\n", 80) == "def f(:\n"
+
+
+def test_native_formatter_keeps_other_code():
+    body = "def f(x):\n    # not laid out\n    return x  # type: ignore\n"
+    assert NativeFormatter().format(body, 80) == body
+    assert NativeFormatter().format("print( x )\n", 80) == "print( x )\n"
+
+
+def test_native_formatter_splits_nested_brackets():
+    code = (
+        "def f(first: dict[str, int], *args: int, callback: Callable[[int], None]"
+        " = default_callback, **kwargs) -> None:\n    pass\n"
+    )
+    assert NativeFormatter().format(code, 40) == (
+        "def f(\n"
+        "    first: dict[str, int],\n"
+        "    *args: int,\n"
+        "    callback: Callable[\n"
+        "        [int], None\n"
+        "    ] = default_callback,\n"
+        "    **kwargs,\n"
+        ") -> None:\n"
+        "    pass\n"
+    )
+
+
+def test_black_formatter_batches_like_single_calls():
+    black = pytest.importorskip("black")
+    formatted = BlackFormatter().format_many(SNIPPETS, 80)
+    for code in SNIPPETS:
+        assert formatted[code] == BlackFormatter().format(code, 80)
+        assert formatted[code] == black.format_str(code, mode=_black_mode(80))
+
+
+def test_format_memo_counts_and_evicts():
+    memo = FormatMemo(maxsize=2)
+    formatter = NativeFormatter()
+    assert memo.format(formatter, SNIPPETS[0], 80) == "x = 1\n"
+    assert memo.format(formatter, SNIPPETS[0], 80) == "x = 1\n"
+    assert (memo.hits, memo.misses) == (1, 1)
+    memo.format(formatter, SNIPPETS[0], 40)
+    memo.format(formatter, SNIPPETS[1], 80)
+    assert ("native", 80, SNIPPETS[0]) not in memo
+    assert ("native", 80, SNIPPETS[1]) in memo
+
+
+def test_format_memo_persists(tmp_path):
+    memo = FormatMemo()
+    memo.format(NativeFormatter(), SNIPPETS[1], 80)
+    BuildCache(tmp_path).store_snippets(dict(memo.entries))
+    loaded = FormatMemo()
+    loaded.update(BuildCache(tmp_path).load_snippets())
+    assert loaded.entries == memo.entries
+    assert (loaded.hits, loaded.misses) == (0, 0)
@@ -0,0 +1,71 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from PyDocuSaurus import constants, crawl_package, ir
+from PyDocuSaurus.generate import main
+from PyDocuSaurus.render import MarkdownRenderer
+
+SAMPLE_PACKAGE = Path(__file__).parent / "sample_package"
+
+
+def _pages(output_path: Path) -> dict[str, str]:
+    return {
+        str(path.relative_to(output_path)): path.read_text(encoding="utf8")
+        for path in output_path.rglob("*.md")
+    }
+
+
+def test_ir_round_trip(tmp_path):
+    package = crawl_package(SAMPLE_PACKAGE)
+    ir.dump(package, tmp_path / "ir.json")
+    loaded = ir.load(tmp_path / "ir.json", package_path=tmp_path / "moved")
+
+    assert loaded.path == tmp_path / "moved"
+    assert [m.fully_qualified_name for m in loaded.modules] == [
+        m.fully_qualified_name for m in package.modules
+    ]
+    assert loaded.symbols.digest() == package.symbols.digest()
+    core = next(m for m in loaded.modules if m.name == "core")
+    assert core.path == tmp_path / "moved" / "core.py"
+    assert all(cls.path is core.path for cls in core.classes)
+
+    MarkdownRenderer().render(package, tmp_path / "crawled", use_runtime=False)
+    MarkdownRenderer().render(loaded, tmp_path / "loaded", use_runtime=False)
+    assert _pages(tmp_path / "loaded") == _pages(tmp_path / "crawled")
+
+
+def test_ir_version_is_checked(tmp_path):
+    package = crawl_package(SAMPLE_PACKAGE)
+    data = ir.package_to_ir(package)
+    data["version"] = ir.IR_VERSION + 1
+    (tmp_path / "ir.json").write_text(json.dumps(data))
+    with pytest.raises(ir.IRError):
+        ir.load(tmp_path / "ir.json")
+
+
+def test_parse_and_render_commands(tmp_path, capsys, monkeypatch):
+    # main() writes its options into the constants module; restore them after.
+    for name in (
+        "INCLUDE_LINES",
+        "MAX_LINES",
+        "INCLUDE_IF",
+        "FORMATTER",
+        "DOCSTRING_STYLE",
+        "IMPORT_TIMEOUT",
+    ):
+        monkeypatch.setattr(constants, name, getattr(constants, name))
+    main(["parse", str(SAMPLE_PACKAGE), "--emit", str(tmp_path / "ir.json")])
+    main(
+        [
+            "render",
+            "--from",
+            str(tmp_path / "ir.json"),
+            str(tmp_path / "docs"),
+            "--no-runtime",
+        ]
+    )
+    main([str(SAMPLE_PACKAGE), str(tmp_path / "direct"), "--no-runtime"])
+    assert _pages(tmp_path / "docs") == _pages(tmp_path / "direct")
+    assert "10 modules" in capsys.readouterr().out
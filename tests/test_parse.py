@@ -0,0 +1,352 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from PyDocuSaurus import crawl_package, crawl_packages
+from PyDocuSaurus.render import MarkdownRenderer
+
+SAMPLE_PACKAGE = Path(__file__).parent / "sample_package"
+
+
+def _render(tmp_path: Path, name: str, **kwargs) -> dict[str, str]:
+    output_path = tmp_path / name
+    package = crawl_package(SAMPLE_PACKAGE, **kwargs)
+    MarkdownRenderer().render(package, output_path, use_runtime=False)
+    return {
+        str(path.relative_to(output_path)): path.read_text(encoding="utf8")
+        for path in output_path.rglob("*.md")
+    }
+
+
+def test_parallel_crawl_matches_serial(tmp_path):
+    serial = _render(tmp_path, "serial")
+    parallel = _render(tmp_path, "parallel", jobs=2)
+    assert serial == parallel
+
+
+def test_crawl_parses_each_file_once(monkeypatch):
+    from PyDocuSaurus import parse
+
+    parsed: list[Path] = []
+    parse_module_source = parse.parse_module_source
+
+    def counting_parse(source, file_path, *args):
+        parsed.append(file_path)
+        return parse_module_source(source, file_path, *args)
+
+    monkeypatch.setattr(parse, "parse_module_source", counting_parse)
+    package = crawl_package(SAMPLE_PACKAGE)
+
+    assert len(parsed) == len(set(parsed))
+    assert sorted(parsed) == sorted(module.path for module in package.modules)
+
+
+def test_constant_comments():
+    from PyDocuSaurus.parse import ConstantComments
+
+    source = (
+        'COLOR = "#fff"\n'
+        "SIZE = 1  # size # in pixels\n"
+        "NAME = (\n"
+        '    "a"\n'
+        ")\n"
+        '"""The name."""\n'
+    )
+    comments = ConstantComments(source)
+    assert comments.get(1) == "size # in pixels"
+    assert comments.get(2) == "size # in pixels"
+    assert comments.get(3) == "The name."
+    assert ConstantComments("X = 1\n" + "\n" * 10 + "# far\n").get(1) is None
+
+
+def test_constant_comments_stop_at_next_statement():
+    from PyDocuSaurus.parse import parse_module_source
+
+    source = (
+        'END = """\n'
+        "</details>\n"
+        '"""\n'
+        "\n"
+        "SECTIONS = {\n"
+        '    "note": "Note",\n'
+        "}  # the sections\n"
+        "\n"
+        "class Foo:\n"
+        '    TEXT = """\n'
+        '"""\n'
+        "    SIZE = 1  # in pixels\n"
+    )
+    module = parse_module_source(source, Path("mod.py"), "mod", False)
+    assert [const.comment for const in module.constants] == [None, "the sections"]
+    assert [const.comment for const in module.classes[0].constants] == [
+        None,
+        "in pixels",
+    ]
+
+
+def test_symbol_index_is_owned_by_crawl():
+    package = crawl_package(SAMPLE_PACKAGE)
+    symbols = package.symbols
+    assert symbols.get("DataProcessor") == {
+        "sample_package.core.DataProcessor": "class"
+    }
+    assert symbols.type_of("sample_package.core.batch_process") == "function"
+    assert "sample_package.core.DataProcessor" in symbols.within("sample_package.core")
+    assert crawl_package(SAMPLE_PACKAGE).symbols.digest() == symbols.digest()
+    symbols.clear()
+    assert len(symbols) == 0
+
+
+def test_exports_resolve_statically(tmp_path):
+    package = crawl_package(SAMPLE_PACKAGE)
+    init = next(
+        m for m in package.modules if m.fully_qualified_name == "sample_package"
+    )
+    assert init.imports["core"] == "sample_package.core"
+    modules = {module.fully_qualified_name: module for module in package.modules}
+    assert package.symbols.resolve_export(modules, "sample_package", "core") == (
+        "module",
+        "sample_package.core",
+    )
+    pages = _render(tmp_path, "static")
+    assert "- 🅜 [core](core)" in pages["index.md"]
+
+
+def test_function_bodies_are_sliced_from_source(monkeypatch):
+    from PyDocuSaurus import constants
+    from PyDocuSaurus.parse import parse_module_source
+
+    monkeypatch.setattr(constants, "INCLUDE_LINES", 6)
+    source = (
+        "class Foo:\n"
+        "    @property\n"
+        "    def name(self):\n"
+        "        # the name\n"
+        "        return 'foo'\n"
+        "\n"
+        "def long():\n" + "    x = 1\n" * 6 + "\n"
+        "class Bar:\n"
+        "    def text(self):\n"
+        '        return """\n'
+        'not indented"""\n'
+    )
+    module = parse_module_source(source, Path("mod.py"), "mod", False)
+    foo, bar = module.classes
+    assert foo.functions[0].body == (
+        "@property\ndef name(self):\n    # the name\n    return 'foo'\n"
+    )
+    assert module.functions[0].body is None
+    # cannot be dedented, so it is generated from the AST
+    assert bar.functions[0].body == "def text(self):\n    return '\\nnot indented'\n"
+
+
+def test_included_bodies_keep_comments(monkeypatch):
+    from PyDocuSaurus import constants
+    from PyDocuSaurus.parse import parse_module_source
+
+    monkeypatch.setattr(constants, "INCLUDE_LINES", 10)
+    body = (
+        "def check(password):  # type: (str) -> None\n"
+        "    # an empty password passes\n"
+        "    if not password:\n"
+        "        pass\n"
+        '    message = ("first part " "second part")\n'
+    )
+    module = parse_module_source(body, Path("mod.py"), "mod", False)
+    lines = MarkdownRenderer().render_function(module.functions[0], 2)
+    assert "\n".join(lines[lines.index("```python") + 1 :]).startswith(body)
+
+
+def test_models_share_module_path(tmp_path):
+    package = crawl_package(SAMPLE_PACKAGE, jobs=2)
+    for module in package.modules:
+        classes = list(module.classes)
+        for cls in classes:
+            classes.extend(cls.classes)
+        items = [*module.constants, *module.functions, *classes]
+        items.extend(func for cls in classes for func in cls.functions)
+        assert all(item.path is module.path for item in items)
+        assert not hasattr(module, "__dict__")
+
+    MarkdownRenderer().render(
+        package, tmp_path / "docs", use_runtime=False, keep_docstrings=False
+    )
+    assert all(module.docstring is None for module in package.modules)
+    assert _render(tmp_path, "kept") == {
+        str(path.relative_to(tmp_path / "docs")): path.read_text(encoding="utf8")
+        for path in (tmp_path / "docs").rglob("*.md")
+    }
+
+
+def test_module_visitor_single_pass():
+    import ast
+
+    from PyDocuSaurus.models import Module
+    from PyDocuSaurus.parse import ConstantComments, ModuleVisitor
+
+    source = (
+        "import os\n"
+        "from . import sub as alias\n"
+        "__all__ = ['f']\n"
+        "A = 1\n"
+        "def f(): pass\n"
+        "if True:\n"
+        "    B = 2\n"
+        "    class C: pass\n"
+        "    if True:\n"
+        "        D = 3\n"
+        "        def g(): pass\n"
+        "else:\n"
+        "    def h(): pass\n"
+        "try:\n"
+        "    from .x import *\n"
+        "except ImportError:\n"
+        "    import json as y\n"
+    )
+    visited = []
+
+    class CountingVisitor(ModuleVisitor):
+        def visit(self, node):
+            visited.append(node)
+            super().visit(node)
+
+    module = Module(
+        path=Path("__init__.py"), name="__init__", fully_qualified_name="pkg"
+    )
+    tree = ast.parse(source)
+    CountingVisitor(module, module.path, False, ConstantComments(source)).visit(tree)
+
+    assert len(visited) == len({id(node) for node in visited})
+    assert [c.name for c in module.constants] == ["A", "B"]
+    assert [f.name for f in module.functions] == ["f", "g"]
+    assert [c.name for c in module.classes] == ["C"]
+    assert module.exports == ["f"]
+    assert module.aliases == {"alias": "sub"}
+    assert module.imports == {"os": "os", "alias": "pkg.sub", "y": "json"}
+    assert module.star_imports == ["pkg.x"]
+
+
+def test_excluded_files_are_never_opened(tmp_path, monkeypatch):
+    package_path = tmp_path / "sample_package"
+    shutil.copytree(
+        SAMPLE_PACKAGE, package_path, ignore=shutil.ignore_patterns("__pycache__")
+    )
+    (package_path / "generated").mkdir()
+    (package_path / "generated" / "__init__.py").write_text("X = 1\n")
+    (package_path / "broken.py").write_text("def broken(:\n")
+    (package_path / ".pdocsignore").write_text("# generated code\ngenerated/\n")
+
+    opened: list[Path] = []
+    path_open = Path.open
+
+    def recording_open(self, *args, **kwargs):
+        opened.append(self)
+        return path_open(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "open", recording_open)
+    package = crawl_package(package_path, exclude=["broken.py"])
+
+    names = {module.fully_qualified_name for module in package.modules}
+    assert "sample_package.core" in names
+    assert "sample_package.broken" not in names
+    assert "sample_package.generated" not in names
+    assert not any(
+        path.name == "broken.py" or "generated" in path.parts for path in opened
+    )
+
+
+def test_exclude_patterns():
+    from PyDocuSaurus.discover import ExcludePatterns
+
+    exclude = ExcludePatterns(["tests/", "*_pb2.py", "_vendor/*", "# comment", ""])
+    assert exclude.patterns == ["tests/", "*_pb2.py", "_vendor/*"]
+    assert exclude.match("tests", is_dir=True)
+    assert exclude.match("sub/tests", is_dir=True)
+    assert not exclude.match("tests", is_dir=False)
+    assert exclude.match("sub/api_pb2.py", is_dir=False)
+    assert exclude.match("_vendor/six.py", is_dir=False)
+    assert not exclude.match("sub/_vendor/six.py", is_dir=False)
+    assert not ExcludePatterns()
+
+
+def test_crawl_namespace_packages_and_several_roots(tmp_path):
+    for dist, name in (("dist1", "tools"), ("dist2", "web")):
+        (tmp_path / dist / "acme" / name).mkdir(parents=True)
+    (tmp_path / "dist1" / "acme" / "tools" / "__init__.py").write_text(
+        '"""Tools."""\n\n\nclass Hammer:\n    """A hammer."""\n'
+    )
+    (tmp_path / "dist1" / "acme" / "base.py").write_text('"""Base."""\n')
+    (tmp_path / "dist2" / "acme" / "web" / "__init__.py").write_text(
+        '"""Web."""\n\n\ndef serve(hammer):\n'
+        '    """Serve.\n\n    Args:\n        hammer (Hammer): Tool.\n    """\n'
+    )
+    (tmp_path / "dist2" / "acme" / "__pycache__").mkdir()
+    (tmp_path / "dist2" / "other").mkdir()
+    (tmp_path / "dist2" / "other" / "__init__.py").write_text(
+        '"""Other."""\n\n\ndef hit(hammer):\n'
+        '    """Hit.\n\n    Args:\n        hammer (Hammer): Tool.\n    """\n'
+    )
+    paths = [
+        tmp_path / "dist1" / "acme",
+        tmp_path / "dist2" / "acme",
+        tmp_path / "dist2" / "other",
+        SAMPLE_PACKAGE,
+    ]
+
+    serial = crawl_packages(paths)
+    parallel = crawl_packages(paths, jobs=2)
+    assert [package.name for package in serial] == ["acme", "other", "sample_package"]
+    acme, _, sample = serial
+    assert [module.fully_qualified_name for module in acme.modules] == [
+        "acme.base",
+        "acme.tools",
+        "acme.web",
+    ]
+    assert acme.symbols is sample.symbols
+    assert "Hammer" in sample.symbols
+    assert [len(package.modules) for package in parallel] == [3, 1, len(sample.modules)]
+
+    stats = MarkdownRenderer().render_packages(
+        serial, tmp_path / "docs", use_runtime=False
+    )
+    # the index.md of the namespace package is not the page of an __init__.py
+    assert stats.written == (3 + 1) + 1 + len(sample.modules) + 1
+    web = (tmp_path / "docs" / "acme" / "web" / "index.md").read_text(encoding="utf8")
+    assert "[Hammer](tools#" in web
+    # names of other packages link to their directory next to the current one
+    page = (tmp_path / "docs" / "other" / "index.md").read_text(encoding="utf8")
+    assert "[Hammer](../acme/tools#" in page
+    index = (tmp_path / "docs" / "index.md").read_text(encoding="utf8")
+    assert "(./sample_package/index.md)" in index
+
+
+def test_duplicate_package_roots_are_rejected(tmp_path):
+    copy = tmp_path / "sample_package"
+    shutil.copytree(SAMPLE_PACKAGE, copy, ignore=shutil.ignore_patterns("__pycache__"))
+    with pytest.raises(ValueError, match="another sample_package"):
+        crawl_packages([SAMPLE_PACKAGE, copy])
+
+
+def test_docstring_memo_and_style(monkeypatch):
+    from PyDocuSaurus import constants
+    from PyDocuSaurus.parse import DocstringMemo, parse_docstring
+
+    memo = DocstringMemo(maxsize=2)
+    raw = "Summary.\n\nArgs:\n    value (int): The value."
+    first = memo.parse(raw, "auto")
+    assert memo.parse(raw, "auto") is first
+    assert memo.parse(raw, "google") is not first
+    assert (memo.hits, memo.misses) == (1, 2)
+    memo.parse("Other.", "auto")
+    assert len(memo.entries) == 2 and ("auto", raw) not in memo.entries
+    assert "1 hits, 3 misses" in memo.stats()
+    memo.drop_entries()
+    assert not memo.entries and "1 hits, 3 misses" in memo.stats()
+
+    monkeypatch.setattr(constants, "DOCSTRING_STYLE", "google")
+    doc = parse_docstring(raw)
+    assert doc.style.name == "GOOGLE"
+    assert [param.arg_name for param in doc.params] == ["value"]
+    # the style is not detected, other styles are only read as descriptions
+    assert parse_docstring(":param value: The value.").params == []
@@ -0,0 +1,41 @@
+import json
+from pathlib import Path
+
+from PyDocuSaurus import crawl_package, profiling
+from PyDocuSaurus.parse import DOCSTRING_MEMO
+from PyDocuSaurus.render import MarkdownRenderer
+
+SAMPLE_PACKAGE = Path(__file__).parent / "sample_package"
+
+
+def test_phase_without_profiler_is_noop():
+    assert profiling.active() is None
+    with profiling.phase("parse", "module"):
+        pass
+    assert profiling.active() is None
+
+
+def test_profiler_records_phases_and_modules(tmp_path):
+    calls = []
+    # docstrings parsed by other tests would be memoized
+    DOCSTRING_MEMO.clear()
+    with profiling.Profiler(trace=True) as profiler:
+        profiler.hooks.append(lambda name, module, seconds: calls.append(name))
+        package = crawl_package(SAMPLE_PACKAGE, jobs=2)
+        MarkdownRenderer().render(package, tmp_path / "docs", use_runtime=False)
+    assert profiling.active() is None
+
+    names = {module.fully_qualified_name for module in package.modules}
+    assert profiler.phases["parse"].calls == len(names)
+    assert profiler.phases["render page"].calls == len(names)
+    for phase in ("crawl", "render", "ast.parse", "docstring_parser.parse", "write"):
+        assert profiler.phases[phase].seconds > 0
+    assert set(profiler.modules) == names
+    assert calls.count("parse") == 0  # parsed in worker processes
+    assert calls.count("render page") == len(names)
+    assert "Slowest modules (top 3):" in profiler.report(3)
+
+    profiler.write_trace(tmp_path / "trace.json")
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    assert sum(event["name"] == "parse" for event in events) == len(names)
+    assert min(event["ts"] for event in events) == 0
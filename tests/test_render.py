@@ -0,0 +1,88 @@
+import ast
+import string
+from pathlib import Path
+
+import pytest
+
+from PyDocuSaurus import crawl_package
+from PyDocuSaurus.render import MarkdownRenderer, escaped_markdown, tokenize_annotation
+
+SAMPLE_PACKAGE = Path(__file__).parent / "sample_package"
+
+_SIMPLE = set(r"\`*__{}[]<>()#+!|")
+_FULL = set(r"\`*_{}[]<>()#+.!|")
+
+
+def _reference_escaped_markdown(text: str, simple=True) -> str:
+    characters = _SIMPLE if simple else _FULL
+    return "".join(f"\\{c}" if c in characters else c for c in text.strip())
+
+
+def _docstrings() -> list[str]:
+    docstrings = []
+    root = Path(__file__).parent.parent
+    for path in [
+        *root.glob("PyDocuSaurus/*.py"),
+        *root.glob("tests/sample_package/**/*.py"),
+    ]:
+        for node in ast.walk(ast.parse(path.read_text(encoding="utf8"))):
+            if isinstance(
+                node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+            ) and (docstring := ast.get_docstring(node, clean=False)):
+                docstrings.append(docstring)
+    return docstrings
+
+
+TEXTS = [
+    "",
+    "   ",
+    string.printable,
+    "  __init__(self, *args, **kwargs) -> dict[str, int]  ",
+    "a.b.c! [link](http://example.com/#anchor) <tag> `code` | {x} + y",
+    "\\already\\ escaped\\_ text\n\ttabs",
+    "ünïcödé — 漢字 🐍 *emphasis*",
+    *_docstrings(),
+]
+
+
+@pytest.mark.parametrize("simple", [True, False])
+def test_escaped_markdown_matches_reference(simple):
+    for text in TEXTS:
+        assert escaped_markdown(text, simple) == _reference_escaped_markdown(
+            text, simple
+        )
+
+
+def test_streamed_pages_match(tmp_path):
+    package = crawl_package(SAMPLE_PACKAGE)
+    MarkdownRenderer().render(package, tmp_path / "lines", use_runtime=False)
+    MarkdownRenderer().render(
+        package, tmp_path / "stream", use_runtime=False, stream=True
+    )
+    pages = sorted((tmp_path / "lines").rglob("*.md"))
+    assert pages
+    for page in pages:
+        streamed = tmp_path / "stream" / page.relative_to(tmp_path / "lines")
+        assert streamed.read_text(encoding="utf8") == page.read_text(encoding="utf8")
+
+
+def test_link_cache_lives_for_one_render(tmp_path):
+    renderer = MarkdownRenderer()
+    renderer.render(crawl_package(SAMPLE_PACKAGE), tmp_path, use_runtime=False)
+    link_cache = renderer.link_cache
+    assert link_cache.misses > 0
+    assert not link_cache.links
+    renderer.render(crawl_package(SAMPLE_PACKAGE), tmp_path, use_runtime=False)
+    assert renderer.link_cache is not link_cache
+
+
+def test_tokenize_annotation():
+    tokens = tokenize_annotation("dict[ str, list[int]]|None")
+    assert "".join(token for _, token in tokens) == "dict[str, list[int]] | None"
+    assert [token for is_name, token in tokens if is_name] == [
+        "dict",
+        "str",
+        "list",
+        "int",
+        "None",
+    ]
@@ -0,0 +1,36 @@
+import os
+
+from PyDocuSaurus.cache import BuildCache
+from PyDocuSaurus.runtime import RuntimeInspector
+
+
+def test_runtime_exports_in_worker(tmp_path, monkeypatch):
+    (tmp_path / "exporting.py").write_text(
+        "from os import path\nfrom json import dumps\nVALUE = 1\n", encoding="utf8"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    cache = BuildCache(tmp_path / "cache")
+    inspector = RuntimeInspector(cache, timeout=30)
+    try:
+        exports = inspector.exports("exporting", ["path", "dumps", "VALUE", "missing"])
+    finally:
+        inspector.close()
+    assert exports == {
+        "path": ("module", os.path.__name__),
+        "dumps": ("function", "json"),
+        "VALUE": ("constant", None),
+    }
+    # served from the cache without starting a worker
+    inspector = RuntimeInspector(cache, timeout=30)
+    assert (
+        inspector.exports("exporting", ["path", "dumps", "VALUE", "missing"]) == exports
+    )
+    assert inspector._pool is None
+
+
+def test_runtime_import_timeout(tmp_path, monkeypatch):
+    (tmp_path / "slow.py").write_text("import time\ntime.sleep(30)\n", encoding="utf8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    inspector = RuntimeInspector(timeout=0.5)
+    assert inspector.exports("slow", ["anything"]) is None
+    assert inspector._pool is None
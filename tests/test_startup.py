@@ -0,0 +1,56 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+# slow to import, only loaded once there is a docstring to parse, a function to
+# print, a cache to check or a module to import
+LAZY_MODULES = (
+    "black",
+    "astor",
+    "docstring_parser",
+    "importlib.metadata",
+    "multiprocessing",
+    "concurrent.futures.process",
+    "cProfile",
+)
+# startup budget of the pdocs entry point, generous for slow machines, the lazy
+# imports keep it well below
+STARTUP_BUDGET_MS = 400
+
+
+def _import_times(module: str) -> list[tuple[str, int, bool]]:
+    """(name, cumulative microseconds, nested) of each import, from -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # nested imports are indented below the one that caused them
+        times.append((name.strip(), int(cumulative), name.startswith("  ")))
+    return times
+
+
+def test_entry_point_imports_lazily():
+    imported = {name for name, _, _ in _import_times("PyDocuSaurus.generate")}
+    assert [name for name in LAZY_MODULES if name in imported] == []
+
+
+def test_entry_point_startup_budget():
+    # the fastest run is the least disturbed by the rest of the machine
+    elapsed = min(
+        sum(
+            microseconds
+            for name, microseconds, nested in _import_times("PyDocuSaurus.generate")
+            if not nested and name.split(".")[0] == "PyDocuSaurus"
+        )
+        for _ in range(3)
+    )
+    assert 0 < elapsed / 1000 < STARTUP_BUDGET_MS
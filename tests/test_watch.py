@@ -0,0 +1,45 @@
+import shutil
+from pathlib import Path
+
+from PyDocuSaurus import crawl_package
+from PyDocuSaurus.render import MarkdownRenderer
+from PyDocuSaurus.watch import PackageWatcher
+
+SAMPLE_PACKAGE = Path(__file__).parent / "sample_package"
+
+
+def _pages(output_path: Path) -> dict[str, str]:
+    return {
+        str(path.relative_to(output_path)): path.read_text(encoding="utf8")
+        for path in output_path.rglob("*.md")
+    }
+
+
+def test_watch_updates_affected_pages(tmp_path):
+    package_path = tmp_path / "sample_package"
+    shutil.copytree(
+        SAMPLE_PACKAGE, package_path, ignore=shutil.ignore_patterns("__pycache__")
+    )
+    package = crawl_package(package_path)
+    renderer = MarkdownRenderer()
+    renderer.render(package, tmp_path / "watched", use_runtime=False)
+    watcher = PackageWatcher(package, tmp_path / "watched", renderer, use_runtime=False)
+    assert watcher.update() is None
+
+    utils = package_path / "utils.py"
+    source = utils.read_text(encoding="utf8")
+    utils.write_text(
+        source.replace("class ValidationError", "class CheckError")
+        + "\n\ndef added() -> None:\n    pass\n",
+        encoding="utf8",
+    )
+    changed = watcher.update()
+    assert "sample_package.utils" in changed
+    assert "sample_package.core" not in changed
+    assert "CheckError" in package.symbols
+    assert "ValidationError" not in package.symbols
+
+    MarkdownRenderer().render(
+        crawl_package(package_path), tmp_path / "full", use_runtime=False
+    )
+    assert _pages(tmp_path / "watched") == _pages(tmp_path / "full")
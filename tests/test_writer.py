@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from PyDocuSaurus.writer import MANIFEST_NAME, OutputWriter, stream_if_changed
+
+
+def test_output_writer_skips_and_deletes(tmp_path):
+    writer = OutputWriter(tmp_path)
+    writer.write(tmp_path / "a.md", "a")
+    writer.write(tmp_path / "sub" / "b.md", "b")
+    stats = writer.close()
+    assert (stats.written, stats.skipped, stats.deleted) == (2, 0, 0)
+
+    mtime = (tmp_path / "a.md").stat().st_mtime_ns
+    writer = OutputWriter(tmp_path)
+    writer.write(tmp_path / "a.md", "a")
+    writer.stream(tmp_path / "c.md", iter(["c", "\n"]))
+    stats = writer.close()
+    assert (stats.written, stats.skipped, stats.deleted) == (1, 1, 1)
+    assert (tmp_path / "a.md").stat().st_mtime_ns == mtime
+    assert (tmp_path / "c.md").read_text() == "c\n"
+    assert not (tmp_path / "sub").exists()
+
+
+def test_stream_leaves_no_partial_file(tmp_path):
+    def chunks():
+        yield "new"
+        raise RuntimeError("render failed")
+
+    (tmp_path / "a.md").write_text("old")
+    with pytest.raises(RuntimeError):
+        stream_if_changed(tmp_path / "a.md", chunks())
+    assert [path.name for path in tmp_path.iterdir()] == ["a.md"]
+    assert (tmp_path / "a.md").read_text() == "old"
+
+
+def test_manifest_entries_stay_in_output(tmp_path):
+    outside = tmp_path / "outside.md"
+    outside.write_text("keep")
+    output_path = tmp_path / "docs"
+    output_path.mkdir()
+    manifest = [str(outside), "../outside.md", "old.md"]
+    (output_path / MANIFEST_NAME).write_text(json.dumps(manifest))
+    (output_path / "old.md").write_text("old")
+    stats = OutputWriter(output_path).close()
+    assert stats.deleted == 1
+    assert outside.read_text() == "keep"
+    assert not (output_path / "old.md").exists()